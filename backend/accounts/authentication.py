@@ -0,0 +1,72 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core.cache import LocalTTLCache
+from .models import User
+
+# user id: (is_active, role, is_superuser), or None for a deleted user. Cleared by accounts/signals.py
+# in the process saving the user, other processes see the change within AUTH_USER_STATUS_TTL seconds
+user_status_cache = LocalTTLCache(
+    maxsize=getattr(settings, 'AUTH_USER_STATUS_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'AUTH_USER_STATUS_TTL', 30),
+)
+
+# Token claims copied onto the user (see MyTokenObtainPairSerializer), other fields are deferred
+CLAIM_FIELDS = ('username', 'email')
+
+_missing = object()
+
+
+def get_user_status(user_id):
+    status = user_status_cache.get(user_id, _missing)
+    if status is _missing:
+        status = User.objects.filter(pk=user_id).values_list('is_active', 'role', 'is_superuser').first()
+        user_status_cache.set(user_id, status)
+    return status
+
+
+def forget_user_status(user_id):
+    user_status_cache.delete(user_id)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication building request.user from the token claims instead of loading the user row.
+
+    Only the active flag, the role and the superuser flag are read from the database, through a
+    short-lived in-process cache, so deactivations and role changes apply within seconds while
+    permission checks on hot endpoints run no user query. The user is a deferred instance: any
+    other field is loaded on first access, and username and email come from the token and may be
+    stale, so views modifying the user must fetch it again (see UserProfileView).
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, stored in the row only
+            return super().get_user(validated_token)
+
+        try:
+            # Tokens carry the id as a string, the cache is keyed by the pk like the signals
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValidationError) as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        status = get_user_status(user_id)
+        if status is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        is_active, role, is_superuser = status
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        values = {'id': user_id, 'is_active': is_active, 'role': role, 'is_superuser': is_superuser}
+        values.update((name, validated_token[name]) for name in CLAIM_FIELDS if name in validated_token)
+        return User.from_db(
+            'default',
+            list(values),
+            [values.get(field.attname, DEFERRED) for field in User._meta.concrete_fields],
+        )
@@ -0,0 +1,149 @@
+import csv
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from core.stats import increment
+from .models import StudentProfile, User
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+
+
+class UserImportRowSerializer(serializers.Serializer):
+    """
+    One row of a user import. Uniqueness is checked once per chunk by UserImporter, not per row.
+    A row without password gets an unusable one: the user sets it through a password reset.
+    """
+    username = serializers.CharField(max_length=150, validators=[UnicodeUsernameValidator()])
+    email = serializers.EmailField(required=False, allow_blank=True, default='')
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    role = serializers.ChoiceField(choices=User.ROLE_CHOICES, required=False, default='student')
+    password = serializers.CharField(required=False, allow_blank=True, default='', trim_whitespace=False)
+
+
+def read_rows(stream, file_format):
+    """
+    Yields (line number, row dict or None, parse error or None) for each record of a text stream.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            row.pop(None, None) # Cells beyond the header
+            yield reader.line_num, {key.strip(): value for key, value in row.items() if value not in (None, '')}, None
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object."
+            continue
+        yield line_number, row, None
+
+
+def _init_worker():
+    # Spawned workers (macOS, Windows) start without Django: the hashers need the settings
+    import django
+    django.setup()
+
+
+class UserImporter:
+    """
+    Creates users from rows read by `read_rows`, `batch_size` rows at a time.
+
+    Each chunk is validated with one query for the usernames already taken, its passwords are
+    hashed by `workers` processes (inline for 1), and its users and student profiles are inserted
+    with bulk_create in one transaction. Bulk inserts send no signals: the dashboard user counters
+    are incremented here. Returns {'created': count, 'errors': [{'line', 'username', 'errors'}]}.
+    """
+
+    def __init__(self, batch_size=1000, workers=1):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.usernames = set() # Seen in the file, to report duplicates
+        self.report = {'created': 0, 'errors': []}
+
+    def run(self, rows):
+        rows = iter(rows)
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) if self.workers > 1 else None
+        try:
+            while chunk := list(islice(rows, self.batch_size)):
+                self.import_chunk(chunk, pool)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.report['errors'].sort(key=lambda error: error['line'])
+        return self.report
+
+    def error(self, line, row, errors):
+        self.report['errors'].append({'line': line, 'username': (row or {}).get('username'), 'errors': errors})
+
+    def validate_chunk(self, chunk):
+        valid = []
+        for line, row, parse_error in chunk:
+            if parse_error:
+                self.error(line, row, {'non_field_errors': [parse_error]})
+                continue
+            serializer = UserImportRowSerializer(data=row)
+            if not serializer.is_valid():
+                self.error(line, row, serializer.errors)
+                continue
+            data = serializer.validated_data
+            if data['username'] in self.usernames:
+                self.error(line, row, {'username': ["Duplicate username in the file."]})
+                continue
+            self.usernames.add(data['username'])
+            valid.append((line, row, data))
+
+        taken = set(User.objects.filter(username__in=[data['username'] for _, _, data in valid]).values_list('username', flat=True))
+        for line, row, data in valid:
+            if data['username'] in taken:
+                self.error(line, row, {'username': ["A user with that username already exists."]})
+        return [(line, row, data) for line, row, data in valid if data['username'] not in taken]
+
+    def import_chunk(self, chunk, pool=None):
+        valid = self.validate_chunk(chunk)
+        if not valid:
+            return
+        # make_password(None) gives an unusable password
+        passwords = [data['password'] or None for _, _, data in valid]
+        if pool is None:
+            hashes = [make_password(password) for password in passwords]
+        else:
+            hashes = list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (self.workers * 4))))
+
+        users = [
+            User(
+                username=data['username'], email=data['email'], first_name=data['first_name'],
+                last_name=data['last_name'], role=data['role'], password=password,
+            )
+            for (_, _, data), password in zip(valid, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create(users)
+                StudentProfile.objects.bulk_create([StudentProfile(user_id=user.pk) for user in users if user.role == 'student'])
+                increment('users', len(users))
+                for role, count in Counter(user.role for user in users).items():
+                    increment(f'users:role:{role}', count)
+        except IntegrityError: # A username taken since the chunk was validated
+            logger.exception("User import chunk of lines %s-%s failed", valid[0][0], valid[-1][0])
+            for line, row, _ in valid:
+                self.error(line, row, {'non_field_errors': ["Not created: another row of its chunk conflicts with an existing user."]})
+            return
+        self.report['created'] += len(users)
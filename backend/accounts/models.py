@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -20,4 +21,45 @@ class StudentProfile(models.Model):
     # academic_level = models.CharField(max_length=50, null=True, blank=True)
 
     def __str__(self):
-        return self.user.username + "'s profile"
\ No newline at end of file
+        return self.user.username + "'s profile"
+
+class RevokedToken(models.Model):
+    """
+    Refresh token that can no longer be used, by its `jti` claim. Kept until the token expires,
+    see `manage.py prune_revoked_tokens`.
+    """
+    jti = models.UUIDField(unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Revoked token {self.jti}"
+
+
+class QueuedEmail(models.Model):
+    """
+    Email waiting in the outbox, rendered and sent by `manage.py send_queued_emails`.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    template = models.CharField(max_length=100) # Key of accounts.outbox.EMAIL_TEMPLATES
+    context = models.JSONField(default=dict)
+    to_email = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='accounts_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.template} to {self.to_email} ({self.status})"
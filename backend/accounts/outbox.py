@@ -0,0 +1,116 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+# QueuedEmail.template: templates of the subject, the text body and the optional HTML body
+EMAIL_TEMPLATES = {
+    'password_reset': {
+        'subject': 'accounts/password_reset_subject.txt',
+        'text': 'accounts/password_reset_email.txt',
+        'html': 'accounts/password_reset_email.html',
+    },
+}
+
+MAX_ATTEMPTS = 5
+
+# Delay before the first retry, doubled on every following one
+RETRY_BACKOFF = timedelta(seconds=30)
+
+# An email still 'sending' after this long belongs to a dead sender and is sent again
+STALE_AFTER = timedelta(minutes=5)
+
+
+def enqueue_email(template, to_email, context):
+    if template not in EMAIL_TEMPLATES:
+        raise ValueError(f"Unknown email template {template!r}")
+    return QueuedEmail.objects.create(template=template, to_email=to_email, context=context)
+
+
+def claim_emails(limit):
+    """
+    Atomically moves up to `limit` emails due for sending to 'sending' and returns them.
+
+    While sending, `next_attempt_at` holds the time after which the claim is considered stale.
+    """
+    now = timezone.now()
+    claimed = []
+    due = QueuedEmail.objects.filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+    for email in due.order_by('next_attempt_at', 'id')[:limit]:
+        updated = QueuedEmail.objects.filter(pk=email.pk, status=email.status, next_attempt_at=email.next_attempt_at).update(
+            status='sending', next_attempt_at=now + STALE_AFTER, attempts=email.attempts + 1
+        )
+        if updated:
+            email.status, email.next_attempt_at, email.attempts = 'sending', now + STALE_AFTER, email.attempts + 1
+            claimed.append(email)
+    return claimed
+
+
+class TemplateSet:
+    """
+    Templates loaded once per batch and rendered for every email using them.
+    """
+
+    def __init__(self):
+        self._templates = {}
+
+    def get(self, key):
+        if key not in self._templates:
+            self._templates[key] = {part: get_template(name) for part, name in EMAIL_TEMPLATES[key].items()}
+        return self._templates[key]
+
+    def build(self, email, connection):
+        templates = self.get(email.template)
+        subject = ''.join(templates['subject'].render(email.context).splitlines())
+        message = EmailMultiAlternatives(
+            subject, templates['text'].render(email.context), settings.DEFAULT_FROM_EMAIL, [email.to_email], connection=connection
+        )
+        if 'html' in templates:
+            message.attach_alternative(templates['html'].render(email.context), 'text/html')
+        return message
+
+
+def _retry_later(email, exc, now):
+    logger.warning("Email %s to %s failed (attempt %s): %s", email.pk, email.to_email, email.attempts, exc)
+    email.error = f"{type(exc).__name__}: {exc}"
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + RETRY_BACKOFF * 2 ** (email.attempts - 1)
+
+
+def send_batch(emails):
+    """
+    Sends claimed emails over a single connection of the email backend. Failures are retried with
+    exponential backoff until MAX_ATTEMPTS, then the email stays 'failed'.
+    """
+    templates = TemplateSet()
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        now = timezone.now()
+        for email in emails:
+            _retry_later(email, exc, now)
+    else:
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([templates.build(email, connection)])
+                except Exception as exc:
+                    _retry_later(email, exc, timezone.now())
+                else:
+                    email.status, email.error, email.sent_at = 'sent', '', timezone.now()
+                    email.context = {} # May hold credentials such as reset links
+        finally:
+            connection.close()
+    QueuedEmail.objects.bulk_update(emails, ['status', 'error', 'next_attempt_at', 'sent_at', 'context'])
+    return emails
@@ -61,7 +61,13 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
             raise serializers.ValidationError({"password": "Password fields didn't match."})
         return data
 
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import TokenBlacklistSerializer, TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import get_user_status
+from .revocation import is_revoked, revoke
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
@@ -75,6 +81,42 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         
         return token
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer checking accounts.revocation instead of simplejwt's blacklist app, and
+    revoking the refresh token it rotates so it can be used once only.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh):
+            raise TokenError(_("Token is blacklisted"))
+
+        # Deactivated users cannot refresh, read from the status cache of accounts.authentication
+        status = get_user_status(User._meta.pk.to_python(refresh[api_settings.USER_ID_CLAIM]))
+        if status is None or not status[0]:
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # The unique jti makes concurrent refreshes with the same token fail but one
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revoke(refresh):
+                raise TokenError(_("Token is blacklisted"))
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+class RevokeTokenSerializer(TokenBlacklistSerializer):
+    """
+    Revokes a refresh token (logout), in accounts.revocation.
+    """
+
+    def validate(self, attrs):
+        revoke(self.token_class(attrs['refresh']))
+        return {}
+
 class UserAdminSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
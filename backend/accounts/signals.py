@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_user_status
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='accounts_user_status_saved')
+@receiver(post_delete, sender=User, dispatch_uid='accounts_user_status_deleted')
+def user_status_changed(sender, instance, **kwargs):
+    # Deactivations and role changes apply to this process's next request
+    forget_user_status(instance.pk)
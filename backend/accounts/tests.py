@@ -1,3 +1,299 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.template.loader import get_template
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.metrics import registry
+from core.stats import read_dashboard_stats
+from .authentication import user_status_cache
+from .models import QueuedEmail, RevokedToken, StudentProfile, User
+from .outbox import MAX_ATTEMPTS, RETRY_BACKOFF, claim_emails, enqueue_email, send_batch
+from .revocation import BloomFilter, revocations
+from .serializers import MyTokenObtainPairSerializer
+from .throttling import SlidingWindowThrottle
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        user_status_cache.clear()
+        self.student = User.objects.create_user('student', 'student@example.cm', 'pass1234', role='student')
+        self.client = APIClient()
+        token = MyTokenObtainPairSerializer.get_token(self.student).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, queries):
+        return [query['sql'] for query in queries if 'FROM "accounts_user"' in query['sql']]
+
+    def test_hot_endpoint_runs_no_user_query_once_cached(self):
+        self.client.get(reverse('my-tests-list'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('my-tests-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user_queries(queries.captured_queries), [])
+
+    def test_deactivation_and_role_change_apply_on_next_request(self):
+        self.assertEqual(self.client.get(reverse('test-start')).status_code, 405) # Allowed for students
+        self.student.role = 'advisor'
+        self.student.save()
+        self.assertEqual(self.client.post(reverse('test-start')).status_code, 403)
+
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.client.get(reverse('my-tests-list')).status_code, 401)
+
+    def test_profile_returns_the_stored_user(self):
+        User.objects.filter(pk=self.student.pk).update(first_name='Awa') # Not in the token
+        response = self.client.patch(reverse('user_profile'), {'last_name': 'Ngo'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.student.refresh_from_db()
+        self.assertEqual((self.student.first_name, self.student.last_name), ('Awa', 'Ngo'))
+        self.assertEqual(response.data['username'], 'student')
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        revocations.reset()
+        user_status_cache.clear()
+        self.user = User.objects.create_user('student', 'student@example.cm', 'pass1234')
+        self.client = APIClient()
+
+    def refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': str(token)}, format='json')
+
+    def test_refresh_rotates_and_refuses_reuse(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.data)
+        self.assertEqual(self.refresh(response.data['refresh']).status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_revoked_token_cannot_refresh(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.client.post(reverse('token_revoke'), {'refresh': str(token)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(RevokedToken.objects.filter(jti=uuid.UUID(token['jti'])).exists())
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_tokens_revoked_elsewhere_are_loaded_on_sync(self):
+        token = RefreshToken.for_user(self.user)
+        revocations.sync(force=True)
+        RevokedToken.objects.create(jti=uuid.UUID(token['jti']), expires_at=timezone.now() + timedelta(days=1))
+        self.assertNotIn(uuid.UUID(token['jti']), revocations.filter)
+        revocations.sync(force=True)
+        self.assertIn(uuid.UUID(token['jti']), revocations.filter)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        added = [uuid.uuid4() for _ in range(1000)]
+        for key in added:
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in added))
+        false_positives = sum(uuid.uuid4() in bloom for _ in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_prune_deletes_expired_revocations_only(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti=uuid.uuid4(), expires_at=now - timedelta(minutes=1))
+        kept = RevokedToken.objects.create(jti=uuid.uuid4(), expires_at=now + timedelta(days=1))
+        call_command('prune_revoked_tokens', batch_size=1, stdout=StringIO())
+        self.assertEqual(list(RevokedToken.objects.all()), [kept])
+
+
+THROTTLED_REST_FRAMEWORK = {
+    **settings.REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {'login_ip': '5/min', 'login_username': '2/min', 'password_reset_ip': '2/min', 'password_reset_email': '5/min'},
+}
+
+
+@override_settings(REST_FRAMEWORK=THROTTLED_REST_FRAMEWORK)
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.client = APIClient()
+        # Middle of a minute window: no request slides out of, or into, a previous window
+        timer = mock.patch.object(SlidingWindowThrottle, 'timer', return_value=1_800_000_030.0)
+        timer.start()
+        self.addCleanup(timer.stop)
+
+    def login(self, username, **extra):
+        return self.client.post(reverse('token_obtain_pair'), {'username': username, 'password': 'wrong'}, format='json', **extra)
+
+    def test_login_is_throttled_per_username_before_hashing(self):
+        with mock.patch('rest_framework_simplejwt.serializers.authenticate', return_value=None) as authenticate:
+            self.assertEqual([self.login('Awa').status_code for _ in range(3)], [401, 401, 429])
+        self.assertEqual(authenticate.call_count, 2)
+        response = self.login('awa ') # Same account
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.login('other').status_code, 401)
+        self.assertIn('throttled_requests_total{scope="login_username"} 2', registry.render())
+
+    def test_login_is_throttled_per_ip(self):
+        statuses = [self.login(f'user{index}').status_code for index in range(6)]
+        self.assertEqual(statuses, [401] * 5 + [429])
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        statuses = [self.login(f'user{index}', HTTP_X_FORWARDED_FOR=f'10.0.0.{index}').status_code for index in range(6)]
+        self.assertEqual(statuses, [401] * 5 + [429])
+
+    @override_settings(REST_FRAMEWORK={**THROTTLED_REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_forwarded_for_identifies_clients_behind_a_proxy(self):
+        # The proxy appends the address it received the request from
+        statuses = [self.login(f'user{index}', HTTP_X_FORWARDED_FOR=f'10.0.0.9, 10.0.0.{index // 3}').status_code for index in range(6)]
+        self.assertEqual(statuses, [401] * 6)
+
+    @override_settings(REST_FRAMEWORK={**THROTTLED_REST_FRAMEWORK, 'NUM_PROXIES': None})
+    def test_unset_proxies_key_on_the_remote_address(self):
+        statuses = [self.login(f'user{index}', HTTP_X_FORWARDED_FOR=f'10.0.0.{index}').status_code for index in range(6)]
+        self.assertEqual(statuses, [401] * 5 + [429])
+
+    def test_password_reset_is_throttled(self):
+        url = reverse('password_reset_request')
+        statuses = [self.client.post(url, {'email': f'{index}@example.cm'}, format='json').status_code for index in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+    def test_counts_in_process_when_the_cache_fails(self):
+        with mock.patch('accounts.throttling.cache.get_many', side_effect=ConnectionError), \
+                mock.patch('accounts.throttling.cache.incr', side_effect=ConnectionError):
+            self.assertEqual([self.login('fallback').status_code for _ in range(3)], [401, 401, 429])
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('awa', 'awa@example.cm', 'pass1234')
+
+    def test_password_reset_is_queued_then_sent_by_the_command(self):
+        response = APIClient().post(reverse('password_reset_request'), {'email': 'awa@example.cm'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+        queued = QueuedEmail.objects.get()
+        self.assertEqual((queued.template, queued.to_email, queued.status), ('password_reset', 'awa@example.cm', 'pending'))
+
+        call_command('send_queued_emails', once=True, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ['awa@example.cm'])
+        self.assertIn(queued.context['reset_link'], message.body)
+        self.assertIn('Bonjour awa', message.alternatives[0][0])
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.context), ('sent', {}))
+
+    def test_batch_loads_templates_once_and_opens_one_connection(self):
+        for index in range(3):
+            enqueue_email('password_reset', f'{index}@example.cm', {'username': str(index), 'reset_link': 'https://example.cm'})
+        with mock.patch('accounts.outbox.get_template', wraps=get_template) as loads, \
+                mock.patch('accounts.outbox.get_connection', wraps=get_connection) as connections:
+            send_batch(claim_emails(limit=10))
+        self.assertEqual(loads.call_count, 3) # Subject, text and HTML
+        self.assertEqual(connections.call_count, 1)
+        self.assertEqual([message.to for message in mail.outbox], [['0@example.cm'], ['1@example.cm'], ['2@example.cm']])
+
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        queued = enqueue_email('password_reset', 'awa@example.cm', {'username': 'awa', 'reset_link': 'https://example.cm'})
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('refused')):
+            before = timezone.now()
+            [email] = send_batch(claim_emails(limit=10))
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertGreaterEqual(email.next_attempt_at, before + RETRY_BACKOFF)
+            self.assertEqual(claim_emails(limit=10), []) # Not due yet
+
+            for attempt in range(2, MAX_ATTEMPTS + 1):
+                QueuedEmail.objects.filter(pk=queued.pk).update(next_attempt_at=timezone.now())
+                [email] = send_batch(claim_emails(limit=10))
+        self.assertEqual((email.status, email.attempts), ('failed', MAX_ATTEMPTS))
+        self.assertIn('refused', email.error)
+        self.assertEqual(mail.outbox, [])
+
+
+class UserImportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@example.cm', 'pass1234', role='admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_csv_upload_creates_users_and_reports_row_errors(self):
+        content = (
+            'username,email,first_name,role,password\n'
+            'awa,awa@example.cm,Awa,,s3cret-pass\n'
+            'paul,paul@example.cm,Paul,advisor,\n'
+            'awa,other@example.cm,,,\n' # Duplicate in the file
+            'admin,,,,\n' # Already exists
+            'bad name!,,,teacher,\n'
+        )
+        upload = SimpleUploadedFile('cohort.csv', content.encode(), content_type='text/csv')
+        response = self.client.post(reverse('admin-user-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [4, 5, 6])
+        self.assertEqual(set(response.data['errors'][2]['errors']), {'username', 'role'})
+
+        awa = User.objects.get(username='awa')
+        self.assertTrue(awa.check_password('s3cret-pass'))
+        self.assertEqual((awa.role, awa.first_name), ('student', 'Awa'))
+        self.assertFalse(User.objects.get(username='paul').has_usable_password())
+        self.assertEqual(list(StudentProfile.objects.values_list('user__username', flat=True)), ['awa'])
+        self.assertEqual(read_dashboard_stats()['total_users'], 3)
+
+    def test_import_requires_an_admin(self):
+        student = User.objects.create_user('student', 'student@example.cm', 'pass1234')
+        self.client.force_authenticate(student)
+        upload = SimpleUploadedFile('cohort.csv', b'username\nawa\n')
+        self.assertEqual(self.client.post(reverse('admin-user-import'), {'file': upload}, format='multipart').status_code, 403)
+
+    @override_settings(USER_IMPORT_MAX_ROWS=2)
+    def test_upload_over_the_row_limit_is_refused(self):
+        upload = SimpleUploadedFile('cohort.csv', b'username\nawa\npaul\nmarie\n')
+        response = self.client.post(reverse('admin-user-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('import_users', response.data['file'][0])
+        self.assertFalse(User.objects.filter(username='awa').exists())
+
+        upload = SimpleUploadedFile('cohort.csv', b'username\nawa\npaul\n')
+        self.assertEqual(self.client.post(reverse('admin-user-import'), {'file': upload}, format='multipart').data['created'], 2)
+
+    def test_chunk_conflict_reports_no_database_error(self):
+        upload = SimpleUploadedFile('cohort.csv', b'username\nawa\n')
+        conflict = IntegrityError('UNIQUE constraint failed: accounts_user.username')
+        with mock.patch('accounts.importing.StudentProfile.objects.bulk_create', side_effect=conflict), self.assertLogs('accounts.importing', 'ERROR'):
+            response = self.client.post(reverse('admin-user-import'), {'file': upload}, format='multipart')
+
+        self.assertEqual(response.data['created'], 0)
+        message = response.data['errors'][0]['errors']['non_field_errors'][0]
+        self.assertNotIn('UNIQUE', message)
+        self.assertFalse(User.objects.filter(username='awa').exists())
+
+    def test_command_imports_jsonl_with_a_process_pool(self):
+        rows = [json.dumps({'username': f'student{index}', 'password': 'pass1234'}) for index in range(5)]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cohort.jsonl')
+            with open(path, 'w') as f:
+                f.write('\n'.join(rows + ['not json']) + '\n')
+            out = StringIO()
+            call_command('import_users', path, workers=2, batch_size=2, stdout=out)
+
+        self.assertIn('5 users created, 1 rows rejected.', out.getvalue())
+        self.assertTrue(User.objects.get(username='student4').check_password('pass1234'))
+        self.assertEqual(StudentProfile.objects.count(), 5)
@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import threading
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from core.cache import LocalTTLCache
+from core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class WindowCounters:
+    """
+    Request counters per (key, window) in the shared cache, or in this process while the cache is unreachable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Window keys are never read again after two windows: the TTL only bounds memory
+        self.local = LocalTTLCache(maxsize=50000, ttl=2 * 86400)
+
+    def get_many(self, keys):
+        try:
+            return cache.get_many(keys)
+        except Exception:
+            logger.warning("Throttle counters unavailable in the cache, counting in this process.")
+            values = {key: self.local.get(key) for key in keys}
+            return {key: value for key, value in values.items() if value is not None}
+
+    def incr(self, key, timeout):
+        try:
+            try:
+                return cache.incr(key)
+            except ValueError: # First request of the window
+                if cache.add(key, 1, timeout):
+                    return 1
+                return cache.incr(key)
+        except Exception:
+            with self._lock:
+                value = self.local.get(key, 0) + 1
+                self.local.set(key, value)
+                return value
+
+
+counters = WindowCounters()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle with a sliding window approximated from two fixed windows: the count of the
+    current window plus the previous one's weighted by the part of it still in the sliding window.
+
+    Two cache reads and one increment per request, instead of the list of every request timestamp
+    SimpleRateThrottle stores and rewrites. Rejected requests are not counted, and are reported as
+    `throttled_requests_total` in the request metrics.
+    """
+
+    def get_rate(self):
+        # Read on every instantiation so rates follow settings overrides
+        self.THROTTLE_RATES = api_settings.DEFAULT_THROTTLE_RATES
+        return super().get_rate()
+
+    def get_ident_value(self, request):
+        """
+        The value identifying who is throttled, None to not throttle the request.
+        """
+        raise NotImplementedError('.get_ident_value() must be overridden')
+
+    def get_cache_key(self, request, view):
+        value = self.get_ident_value(request)
+        if not value:
+            return None
+        # Hashed to keep user input out of cache keys
+        ident = hashlib.sha256(value.encode()).hexdigest()[:32]
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = (self.now % self.duration) / self.duration
+        current_key, previous_key = f'{key}:{window}', f'{key}:{window - 1}'
+        counts = counters.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+
+        if self.previous * (1 - self.elapsed) + self.current >= self.num_requests:
+            registry.increment('throttled_requests_total', (('scope', self.scope),))
+            return False
+        counters.incr(current_key, timeout=2 * self.duration)
+        return True
+
+    def wait(self):
+        if self.current < self.num_requests:
+            # Until enough of the previous window has slid out
+            needed = 1 - (self.num_requests - self.current) / self.previous
+            return max(0.0, needed - self.elapsed) * self.duration
+        # Until the next window, then until enough of this one has slid out
+        needed = 1 - self.num_requests / self.current
+        return (1 - self.elapsed + needed) * self.duration
+
+
+class IPThrottle(SlidingWindowThrottle):
+    """
+    Throttles by client address. X-Forwarded-For is only read behind the NUM_PROXIES proxies
+    of the REST_FRAMEWORK settings: without it, DRF would key on a header the client chooses.
+    """
+
+    def get_ident_value(self, request):
+        if api_settings.NUM_PROXIES is None:
+            return request.META.get('REMOTE_ADDR')
+        return self.get_ident(request)
+
+
+class RequestFieldThrottle(SlidingWindowThrottle):
+    """
+    Throttles by the value of a request body field, e.g. the username being logged in as.
+    """
+    field = None
+
+    def get_ident_value(self, request):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        return value.strip().casefold() if isinstance(value, str) else None
+
+
+class LoginIPThrottle(IPThrottle):
+    scope = 'login_ip'
+
+
+class LoginUsernameThrottle(RequestFieldThrottle):
+    scope = 'login_username'
+    field = 'username'
+
+
+class PasswordResetIPThrottle(IPThrottle):
+    scope = 'password_reset_ip'
+
+
+class PasswordResetEmailThrottle(RequestFieldThrottle):
+    scope = 'password_reset_email'
+    field = 'email'
@@ -3,6 +3,7 @@ from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
     TokenVerifyView,
+    TokenBlacklistView,
 )
 from .views import (
     UserRegistrationView, 
@@ -12,6 +13,7 @@ from .views import (
     UserAdminListCreateAPIView,
     UserAdminDetailAPIView,
     AdminDashboardStatsView,
+    UserImportView,
     MyTokenObtainPairView, # Import the custom view
 )
 
@@ -20,12 +22,14 @@ urlpatterns = [
     path('token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'), # Use the custom view
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('token/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('token/revoke/', TokenBlacklistView.as_view(), name='token_revoke'), # Logout
     path('password-reset/', PasswordResetRequestView.as_view(), name='password_reset_request'),
     path('password-reset/confirm/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
     path('profile/', UserProfileView.as_view(), name='user_profile'),
     
     # Admin-specific URLs
     path('admin/users/', UserAdminListCreateAPIView.as_view(), name='admin-user-list-create'),
+    path('admin/users/import/', UserImportView.as_view(), name='admin-user-import'),
     path('admin/users/<int:pk>/', UserAdminDetailAPIView.as_view(), name='admin-user-detail'),
     path('admin/stats/', AdminDashboardStatsView.as_view(), name='admin-dashboard-stats'),
 ]
\ No newline at end of file
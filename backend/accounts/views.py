@@ -1,22 +1,28 @@
+import io
+
 from rest_framework import generics, permissions
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 from django.conf import settings
 from django.db.models.fields import BLANK_CHOICE_DASH
 from django.shortcuts import get_object_or_404
 
 
 from .serializers import UserRegistrationSerializer, UserSerializer, PasswordResetRequestSerializer, PasswordResetConfirmSerializer, MyTokenObtainPairSerializer
+from .importing import IMPORT_FORMATS, UserImporter, read_rows
 from .models import User
+from .outbox import enqueue_email
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, PasswordResetEmailThrottle, PasswordResetIPThrottle
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    # Checked before the serializer hashes the password
+    throttle_classes = (LoginIPThrottle, LoginUsernameThrottle)
 
 class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -39,6 +45,7 @@ class UserRegistrationView(generics.CreateAPIView):
 class PasswordResetRequestView(generics.GenericAPIView):
     serializer_class = PasswordResetRequestSerializer
     permission_classes = (permissions.AllowAny,)
+    throttle_classes = (PasswordResetIPThrottle, PasswordResetEmailThrottle)
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
@@ -54,16 +61,8 @@ class PasswordResetRequestView(generics.GenericAPIView):
             # Construct reset link (frontend responsibility to consume this)
             reset_link = f"{settings.FRONTEND_URL}/reset-password/{uid}/{token}/"
 
-            # In a real application, send an email here. For now, print to console.
-            print(f"Password reset link for {user.email}: {reset_link}")
-            
-            # Example of how to send an email (requires email configuration in settings.py)
-            # mail_subject = "Password Reset Requested"
-            # message = render_to_string('accounts/password_reset_email.html', {
-            #     'user': user,
-            #     'reset_link': reset_link,
-            # })
-            # send_mail(mail_subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+            # Sent by `manage.py send_queued_emails`, out of the request
+            enqueue_email('password_reset', user.email, {'username': user.username, 'reset_link': reset_link})
 
         return Response({"detail": "Password reset if email is registered."}, status=status.HTTP_200_OK)
 
@@ -97,45 +96,68 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        # request.user is built from the token claims (see accounts/authentication.py), load the full row
+        return get_object_or_404(User, pk=self.request.user.pk)
 
 from .permissions import IsAdmin
 from .serializers import UserAdminSerializer
-from orientation.models import OrientationTest
-from catalog.models import Field, Institution
-from django.db.models import Count
+from core.pagination import KeysetOrPagePagination
+from core.stats import read_dashboard_stats
+
+class UserAdminPagination(KeysetOrPagePagination):
+    ordering = ('id',)
 
 class UserAdminListCreateAPIView(generics.ListCreateAPIView):
     queryset = User.objects.all().order_by('id')
     serializer_class = UserAdminSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    pagination_class = UserAdminPagination
 
 class UserAdminDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserAdminSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
 
+class UserImportView(generics.GenericAPIView):
+    """
+    Creates users from an uploaded CSV or JSON Lines `file` (see accounts/importing.py),
+    answering the number created and the errors of the rejected rows.
+
+    The import runs inside the request, so files are limited to USER_IMPORT_MAX_ROWS rows:
+    larger cohorts are imported with `manage.py import_users`.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+    parser_classes = (MultiPartParser,)
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"file": ["No file was submitted."]}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format') or ('jsonl' if upload.name.endswith(('.jsonl', '.ndjson')) else 'csv')
+        if file_format not in IMPORT_FORMATS:
+            return Response({"format": [f"Expected one of {', '.join(IMPORT_FORMATS)}."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Non-empty lines, an upper bound of the rows (CSV cells may span lines)
+        max_rows = settings.USER_IMPORT_MAX_ROWS
+        too_large = upload.size > settings.USER_IMPORT_MAX_UPLOAD_SIZE
+        if not too_large:
+            lines = sum(1 for line in upload.file if line.strip())
+            too_large = lines - (file_format == 'csv') > max_rows
+            upload.file.seek(0)
+        if too_large:
+            return Response(
+                {"file": [f"At most {max_rows} rows can be uploaded, import larger files with `manage.py import_users`."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace', newline='')
+        # Passwords are hashed inline: no process pool is started from a web worker
+        report = UserImporter(batch_size=max_rows, workers=1).run(read_rows(stream, file_format))
+        return Response(report, status=status.HTTP_200_OK)
+
 class AdminDashboardStatsView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
 
     def get(self, request, *args, **kwargs):
-        total_users = User.objects.count()
-        users_by_role = User.objects.values('role').annotate(count=Count('role'))
-        total_tests_completed = OrientationTest.objects.filter(is_completed=True).count()
-        tests_started = OrientationTest.objects.count()
-
-        # Top 10 recommended/consulted fields (placeholder, requires actual tracking)
-        # For now, just a count of fields/institutions
-        total_fields = Field.objects.count()
-        total_institutions = Institution.objects.count()
-
-        data = {
-            "total_users": total_users,
-            "users_by_role": list(users_by_role),
-            "total_tests_completed": total_tests_completed,
-            "tests_started": tests_started,
-            "total_academic_fields": total_fields,
-            "total_institutions": total_institutions,
-            # Add more stats as needed, e.g., top 10 recommended fields, etc.
-        }
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        # Served from the counters materialized by core/signals.py (see `manage.py reconcile_stats`)
+        return Response(read_dashboard_stats(), status=status.HTTP_200_OK)
\ No newline at end of file
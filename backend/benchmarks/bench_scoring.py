@@ -0,0 +1,53 @@
+import numpy as np
+
+from orientation.jobs import score_test, scoring_queryset
+from orientation.recommendation import CATEGORIES, RecommendationEngine, compute_user_scores
+from orientation.rescoring import ResponseRow, score_batch
+from orientation.scoring import get_scorers
+from orientation.validation import get_answer_schemas
+from conftest import answer_for
+
+
+def random_engine(fields=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return RecommendationEngine(np.arange(1, fields + 1), rng.random((fields, len(CATEGORIES))))
+
+
+def bench_compute_user_scores(benchmark, completed_test):
+    scorers = get_scorers()
+    responses = list(completed_test.responses.all())
+    benchmark(compute_user_scores, responses, scorers)
+
+
+def bench_validate_answers(benchmark, question_bank):
+    schemas = get_answer_schemas()
+    answers = [(question.pk, answer_for(question, index)) for index, question in enumerate(question_bank)]
+    benchmark(lambda: [schemas[question_id].error(answer) for question_id, answer in answers])
+
+
+def bench_engine_top_k(benchmark):
+    engine = random_engine()
+    profile = {category: 0.8 for category in CATEGORIES}
+    benchmark(engine.top_k, profile)
+
+
+def bench_engine_top_k_many(benchmark):
+    engine = random_engine()
+    rng = np.random.default_rng(1)
+    profiles = [dict(zip(CATEGORIES, row)) for row in rng.random((1000, len(CATEGORIES)))]
+    benchmark(engine.top_k_many, profiles)
+
+
+def bench_score_batch(benchmark, question_bank, catalog):
+    engine = RecommendationEngine.from_index()
+    scorers = get_scorers()
+    batch = [
+        (test_id, [ResponseRow(question.pk, answer_for(question, test_id + index)) for index, question in enumerate(question_bank)])
+        for test_id in range(1000)
+    ]
+    benchmark(score_batch, batch, engine, scorers)
+
+
+def bench_score_test(benchmark, completed_test):
+    # End to end: load the answers, score, store the recommendation
+    benchmark(lambda: score_test(scoring_queryset().get(pk=completed_test.pk)))
@@ -0,0 +1,21 @@
+from catalog.models import Field
+from catalog.serializers import FieldListSerializer, FieldSerializer
+from orientation.models import OrientationTest
+from orientation.jobs import score_test, scoring_queryset
+from orientation.serializers import OrientationTestSerializer
+
+
+def bench_field_list_serializer(benchmark, catalog):
+    fields = list(Field.objects.prefetch_related('institutions').order_by('name', 'id')[:100])
+    benchmark(lambda: FieldListSerializer(fields, many=True).data)
+
+
+def bench_field_serializer(benchmark, catalog):
+    fields = list(Field.objects.prefetch_related('institutions').order_by('name', 'id')[:100])
+    benchmark(lambda: FieldSerializer(fields, many=True).data)
+
+
+def bench_orientation_test_serializer(benchmark, completed_test):
+    score_test(scoring_queryset().get(pk=completed_test.pk))
+    orientation_test = OrientationTestSerializer.setup_eager_loading(OrientationTest.objects.all()).get(pk=completed_test.pk)
+    benchmark(lambda: OrientationTestSerializer(orientation_test).data)
@@ -0,0 +1,67 @@
+import pytest
+
+from accounts.models import User
+from catalog.models import Field, Institution
+from orientation.models import OrientationTest, Question, TestResponse
+
+
+@pytest.fixture
+def catalog(db):
+    """
+    200 indexed fields spread over 20 institutions.
+    """
+    institutions = [Institution.objects.create(name=f"Institut {index}", city='Douala', type='public') for index in range(20)]
+    descriptions = ['Sciences et technologies', 'Mathématiques appliquées', 'Arts et lettres', 'Économie et gestion']
+    fields = []
+    for index in range(200):
+        field = Field.objects.create(
+            name=f"Filière {index}",
+            description=descriptions[index % len(descriptions)],
+            duration_years=5,
+            career_opportunities=['Ingénieur', 'Chercheur'],
+            required_skills=['Mathématiques', 'Analyse'],
+        )
+        field.institutions.add(institutions[index % len(institutions)])
+        fields.append(field)
+    return fields
+
+
+@pytest.fixture
+def question_bank(db):
+    """
+    40 questions: likert, MCQ and ranking in every category.
+    """
+    choices = ['Sciences (maths, physique, chimie)', 'Littérature et langues', 'Arts et design', 'Résoudre des problèmes de maths']
+    categories = [category for category, label in Question.CATEGORY_CHOICES]
+    questions = []
+    for index in range(40):
+        question_type = ['likert', 'likert', 'mcq', 'ranking'][index % 4]
+        questions.append(Question.objects.create(
+            text=f"Question {index}",
+            category=categories[index % len(categories)],
+            question_type=question_type,
+            options=[1, 2, 3, 4, 5] if question_type == 'likert' else choices,
+        ))
+    return questions
+
+
+def answer_for(question, index):
+    if question.question_type == 'likert':
+        return index % 5 + 1
+    if question.question_type == 'ranking':
+        return question.options[index % 4:] + question.options[:index % 4]
+    return question.options[index % 4]
+
+
+@pytest.fixture
+def completed_test(db, question_bank, catalog):
+    """
+    A completed test answering the whole question bank.
+    """
+    student = User.objects.create_user('etudiant', 'etudiant@enspd.cm', 'etudiant123', role='student')
+    orientation_test = OrientationTest.objects.create(user=student, is_completed=True)
+    TestResponse.objects.bulk_create(
+        TestResponse(orientation_test=orientation_test, question=question, answer=answer_for(question, index))
+        for index, question in enumerate(question_bank)
+    )
+    return orientation_test
@@ -0,0 +1,198 @@
+"""
+Scripted load profile for a running server, e.g. `python manage.py runserver` on data created by
+`python manage.py seed_benchmark_data`.
+
+Each virtual user logs in as one of the generated students, then loops over the orientation flow
+(start a test, load the questions, submit every answer, complete, poll the result until ready)
+interleaved with catalog browsing. Only the standard library is used: requests go through urllib
+in worker threads, driven by asyncio.
+
+    python benchmarks/load_profile.py --base-url http://127.0.0.1:8000 --users 20 --duration 60 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+BENCHMARK_PASSWORD = 'bench123' # See core/management/commands/seed_benchmark_data.py
+
+SEARCH_TERMS = ['sci', 'math', 'gestion', 'informatique', 'arts', 'génie', 'santé']
+
+
+class Client:
+    """
+    Minimal JSON client recording the latency of every request under a step name.
+    """
+
+    def __init__(self, base_url, timings, errors):
+        self.base_url = base_url.rstrip('/')
+        self.timings = timings
+        self.errors = errors
+        self.token = None
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header('Accept', 'application/json')
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body = response.read()
+                return response.status, json.loads(body) if body else None
+        except urllib.error.HTTPError as error:
+            body = error.read()
+            try:
+                return error.code, json.loads(body) if body else None
+            except ValueError:
+                return error.code, None
+
+    async def call(self, step, method, path, payload=None, expect=(200,)):
+        started = time.perf_counter()
+        try:
+            status, body = await asyncio.to_thread(self._request, method, path, payload)
+        except (urllib.error.URLError, OSError) as error:
+            self.errors[step].append(str(error))
+            return None, None
+        self.timings[step].append(time.perf_counter() - started)
+        if status not in expect:
+            self.errors[step].append(f'HTTP {status}')
+        return status, body
+
+
+def answer_for(question, rng):
+    options = question.get('options') or [] # Labels only, see orientation.serializers.QuestionSerializer
+    if question['question_type'] == 'likert':
+        return rng.choice(options or [1, 2, 3, 4, 5])
+    if question['question_type'] == 'ranking':
+        return rng.sample(options, len(options))
+    return rng.choice(options) if options else ''
+
+
+async def orientation_flow(client, rng):
+    status, test = await client.call('test:start', 'POST', '/api/orientation/tests/start/', {}, expect=(201,))
+    if status != 201:
+        return
+    status, questions = await client.call('questions:list', 'GET', '/api/orientation/questions/')
+    if status != 200:
+        return
+    payload = {'responses': [{'question_id': question['id'], 'answer': answer_for(question, rng)} for question in questions]}
+    await client.call('test:submit', 'POST', f"/api/orientation/tests/{test['id']}/submit-responses/", payload)
+    await client.call('test:complete', 'POST', f"/api/orientation/tests/{test['id']}/complete/", {}, expect=(200, 202))
+
+    # Asynchronous scoring answers 202 until the worker stored the recommendation
+    for _ in range(20):
+        status, result = await client.call('test:result', 'GET', f"/api/orientation/tests/{test['id']}/result/", expect=(200, 202))
+        if status != 202:
+            break
+        await asyncio.sleep(0.25)
+
+
+async def catalog_flow(client, rng):
+    status, page = await client.call('fields:list', 'GET', '/api/catalog/fields/')
+    if status == 200 and page['results']:
+        field = rng.choice(page['results'])
+        await client.call('fields:detail', 'GET', f"/api/catalog/fields/{field['id']}/")
+    await client.call('fields:search', 'GET', f"/api/catalog/fields/search/?q={urllib.parse.quote(rng.choice(SEARCH_TERMS))}")
+    await client.call('autocomplete', 'GET', f"/api/catalog/autocomplete/?q={urllib.parse.quote(rng.choice(SEARCH_TERMS)[:2])}")
+    await client.call('institutions:list', 'GET', '/api/catalog/institutions/')
+    await client.call('tests:mine', 'GET', '/api/orientation/my-tests/')
+
+
+async def virtual_user(index, args, deadline, timings, errors):
+    rng = random.Random(args.seed + index)
+    client = Client(args.base_url, timings, errors)
+    username = f'bench_student_{index + 1}'
+    status, tokens = await client.call(
+        'token', 'POST', '/api/accounts/token/', {'username': username, 'password': BENCHMARK_PASSWORD}
+    )
+    if status != 200:
+        return 0
+    client.token = tokens['access']
+
+    iterations = 0
+    while time.monotonic() < deadline and (not args.iterations or iterations < args.iterations):
+        if rng.random() < args.orientation_ratio:
+            await orientation_flow(client, rng)
+        else:
+            await catalog_flow(client, rng)
+        iterations += 1
+    return iterations
+
+
+def summarize(timings, errors, elapsed):
+    steps = {}
+    for step in sorted(set(timings) | set(errors)):
+        samples = sorted(timings.get(step, []))
+        summary = {'requests': len(samples), 'errors': len(errors.get(step, []))}
+        if samples:
+            quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else [samples[0]] * 99
+            summary.update({
+                'rps': round(len(samples) / elapsed, 2),
+                'mean_ms': round(statistics.fmean(samples) * 1000, 2),
+                'p50_ms': round(quantiles[49] * 1000, 2),
+                'p95_ms': round(quantiles[94] * 1000, 2),
+                'p99_ms': round(quantiles[98] * 1000, 2),
+                'max_ms': round(samples[-1] * 1000, 2),
+            })
+        steps[step] = summary
+    return steps
+
+
+async def main(args):
+    timings = defaultdict(list)
+    errors = defaultdict(list)
+    started = time.monotonic()
+    deadline = started + args.duration
+    iterations = await asyncio.gather(*(virtual_user(index, args, deadline, timings, errors) for index in range(args.users)))
+    elapsed = time.monotonic() - started
+
+    report = {
+        'base_url': args.base_url,
+        'users': args.users,
+        'elapsed_s': round(elapsed, 2),
+        'iterations': sum(iterations),
+        'steps': summarize(timings, errors, elapsed),
+    }
+    print(f"{'step':<20}{'requests':>10}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, summary in report['steps'].items():
+        print(
+            f"{step:<20}{summary['requests']:>10}{summary['errors']:>8}{summary.get('rps', 0):>9}"
+            f"{summary.get('p50_ms', '-'):>10}{summary.get('p95_ms', '-'):>10}{summary.get('p99_ms', '-'):>10}"
+        )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users, at most the generated students.')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run for.')
+    parser.add_argument('--iterations', type=int, default=0, help='Stop each user after this many flows (0: no limit).')
+    parser.add_argument('--orientation-ratio', type=float, default=0.3, help='Share of flows taking an orientation test.')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write the report as JSON to this file.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = parse_args()
+    loop = asyncio.new_event_loop()
+    # Enough threads for every virtual user to have a request in flight
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(arguments.users, 1)))
+    try:
+        loop.run_until_complete(main(arguments))
+    finally:
+        loop.close()
@@ -0,0 +1,96 @@
+import threading
+from bisect import bisect_left
+
+from django.conf import settings
+
+from core.cache import bump_version, get_version
+from .features import fold_text
+from .models import Field, Institution
+
+# Cache namespace bumped by catalog/signals.py whenever a suggested label may have changed
+AUTOCOMPLETE_NAMESPACE = 'catalog:autocomplete'
+
+
+def get_autocomplete_version():
+    """
+    Version of the suggested labels. Expires after AUTOCOMPLETE_MAX_AGE seconds, so processes with
+    their own cache (locmem), which do not see the bumps of the others, still rebuild their index.
+    """
+    return get_version(AUTOCOMPLETE_NAMESPACE, timeout=settings.AUTOCOMPLETE_MAX_AGE)
+
+
+def bump_autocomplete_version():
+    return bump_version(AUTOCOMPLETE_NAMESPACE, timeout=settings.AUTOCOMPLETE_MAX_AGE)
+
+
+class PrefixIndex:
+    """
+    Sorted array of (folded key, kind, id, label), searched with bisect.
+
+    Every word of a label starts a key, so "Génie Civil" is suggested for both "gen" and "civ".
+    """
+
+    def __init__(self, entries):
+        self.entries = sorted(entries)
+        self.keys = [entry[0] for entry in self.entries]
+
+    @classmethod
+    def from_labels(cls, labels):
+        """
+        Builds the index from (kind, id, label) triples.
+        """
+        entries = []
+        for kind, object_id, label in labels:
+            words = fold_text(label).split()
+            for position in range(len(words)):
+                entries.append((' '.join(words[position:]), position, kind, object_id, label))
+        return cls(entries)
+
+    def search(self, query, limit=10):
+        prefix = ' '.join(fold_text(query).split())
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        index = bisect_left(self.keys, prefix)
+        while index < len(self.entries) and len(results) < limit:
+            key, position, kind, object_id, label = self.entries[index]
+            if not key.startswith(prefix):
+                break
+            if (kind, object_id, label) not in seen:
+                seen.add((kind, object_id, label))
+                results.append({'type': kind, 'id': object_id, 'label': label})
+            index += 1
+        return results
+
+
+def build_prefix_index():
+    labels = [('field', field_id, name) for field_id, name in Field.objects.values_list('id', 'name')]
+    cities = set()
+    for institution_id, name, city in Institution.objects.values_list('id', 'name', 'city'):
+        labels.append(('institution', institution_id, name))
+        cities.add(city)
+    labels.extend(('city', None, city) for city in cities if city)
+    return PrefixIndex.from_labels(labels)
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_prefix_index():
+    """
+    Returns the process-wide prefix index, rebuilt when the catalog version changes or expires.
+    """
+    global _index, _index_version
+    version = get_autocomplete_version()
+    with _index_lock:
+        if _index is None or _index_version != version:
+            _index = build_prefix_index()
+            _index_version = version
+        return _index
+
+
+def autocomplete(query, limit=10):
+    return get_prefix_index().search(query, limit=limit)
@@ -0,0 +1,46 @@
+from django.conf import settings
+from rest_framework.response import Response
+
+from core.cache import ReadThroughCache
+
+# Rendered detail payloads, invalidated by catalog/signals.py
+field_detail_cache = ReadThroughCache('catalog:field-detail', timeout=settings.CATALOG_CACHE_TTL['field'])
+institution_detail_cache = ReadThroughCache('catalog:institution-detail', timeout=settings.CATALOG_CACHE_TTL['institution'])
+
+
+def absolute_file_urls(data, path, request):
+    """
+    Makes the file URLs at `path` ("logo", or "institutions.logo" in a list of nested objects)
+    of a representation absolute for the request, in place.
+    """
+    if isinstance(data, list):
+        for item in data:
+            absolute_file_urls(item, path, request)
+        return
+    key, _, rest = path.partition('.')
+    if rest:
+        absolute_file_urls(data.get(key) or [], rest, request)
+    elif data.get(key):
+        data[key] = request.build_absolute_uri(data[key])
+
+
+class CachedRetrieveMixin:
+    """
+    Serves GET on a detail view from a read-through cache of its rendered representation.
+
+    The representation is cached without a request, so file fields hold relative URLs: those listed
+    in `file_url_paths` are made absolute for each response, and every host shares one cache entry.
+    """
+    detail_cache = None
+    file_url_paths = ()
+
+    def retrieve(self, request, *args, **kwargs):
+        def load():
+            serializer_class = self.get_serializer_class()
+            return serializer_class(self.get_object(), context={'view': self, 'format': self.format_kwarg}).data
+
+        # A copy from the cache, or the loaded value already stored: safe to modify
+        data = self.detail_cache.get(self.kwargs[self.lookup_url_kwarg or self.lookup_field], load)
+        for path in self.file_url_paths:
+            absolute_file_urls(data, path, request)
+        return Response(data)
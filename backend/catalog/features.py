@@ -0,0 +1,97 @@
+import unicodedata
+
+from django.db import transaction
+
+# Scoring dimensions of a field, aligned with the orientation question categories
+FEATURE_DIMENSIONS = (
+    'academic_interests',
+    'perceived_skills',
+    'professional_values',
+    'work_preferences',
+)
+
+ACADEMIC_KEYWORDS = ('science', 'tech', 'informatique', 'ingénierie')
+SKILL_KEYWORDS = ('mathématiques', 'programmation', 'analyse')
+
+
+def fold_text(value):
+    """
+    Lowercases a string and strips its accents ("Ingénierie" -> "ingenierie").
+    """
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def compute_vector(description, required_skills):
+    """
+    Returns one 0/1 weight per scoring dimension, in FEATURE_DIMENSIONS order.
+    """
+    description = description.lower()
+    skills = {str(skill).lower() for skill in required_skills}
+    return [
+        1.0 if any(keyword in description for keyword in ACADEMIC_KEYWORDS) else 0.0,
+        1.0 if any(skill in skills for skill in SKILL_KEYWORDS) else 0.0,
+        0.0, # No field attribute maps to professional values yet
+        0.0, # No field attribute maps to work preferences yet
+    ]
+
+
+def compose_search_text(name, description, career_opportunities, required_skills, institutions=()):
+    """
+    Builds the accent-folded text searched by the catalog. `institutions` is a list of (name, city).
+    """
+    parts = [name, description]
+    parts.extend(str(item) for item in career_opportunities)
+    parts.extend(str(item) for item in required_skills)
+    for institution_name, city in institutions:
+        parts.extend([institution_name, city])
+    return fold_text(' '.join(part for part in parts if part))
+
+
+def build_feature_vector(field):
+    from .models import FieldFeatureVector
+
+    institutions = [(institution.name, institution.city) for institution in field.institutions.all()]
+    return FieldFeatureVector(
+        field=field,
+        vector=compute_vector(field.description, field.required_skills),
+        search_text=compose_search_text(
+            field.name, field.description, field.career_opportunities, field.required_skills, institutions
+        ),
+    )
+
+
+def refresh_field_index(field_ids):
+    """
+    Recomputes the index rows of the given fields. Ids of deleted fields are ignored.
+    """
+    from .models import Field, FieldFeatureVector
+
+    field_ids = set(field_ids)
+    if not field_ids:
+        return 0
+    fields = Field.objects.filter(pk__in=field_ids).prefetch_related('institutions')
+    vectors = [build_feature_vector(field) for field in fields]
+    with transaction.atomic():
+        FieldFeatureVector.objects.bulk_create(
+            vectors,
+            update_conflicts=True,
+            unique_fields=['field'],
+            update_fields=['vector', 'search_text', 'updated_at'],
+        )
+    return len(vectors)
+
+
+def rebuild_field_index(batch_size=500):
+    """
+    Rebuilds the whole index, `batch_size` fields at a time. Returns the number of indexed fields.
+    """
+    from .models import Field, FieldFeatureVector
+
+    indexed = 0
+    with transaction.atomic():
+        FieldFeatureVector.objects.all().delete()
+        field_ids = list(Field.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(field_ids), batch_size):
+            indexed += refresh_field_index(field_ids[start:start + batch_size])
+    return indexed
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from catalog.features import compose_search_text, compute_vector
+
+
+def build_index(apps, schema_editor):
+    Field = apps.get_model('catalog', 'Field')
+    FieldFeatureVector = apps.get_model('catalog', 'FieldFeatureVector')
+    vectors = []
+    for field in Field.objects.prefetch_related('institutions'):
+        institutions = [(institution.name, institution.city) for institution in field.institutions.all()]
+        vectors.append(FieldFeatureVector(
+            field=field,
+            vector=compute_vector(field.description, field.required_skills),
+            search_text=compose_search_text(
+                field.name, field.description, field.career_opportunities, field.required_skills, institutions
+            ),
+        ))
+    FieldFeatureVector.objects.bulk_create(vectors, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldFeatureVector',
+            fields=[
+                ('field', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feature_vector', serialize=False, to='catalog.field')),
+                ('vector', models.JSONField(default=list)),
+                ('search_text', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
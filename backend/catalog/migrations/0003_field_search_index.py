@@ -0,0 +1,66 @@
+from django.db import migrations
+
+SQLITE_SETUP = [
+    # External content table: the text lives in catalog_fieldfeaturevector, FTS5 only stores the index
+    """
+    CREATE VIRTUAL TABLE catalog_field_fts USING fts5(
+        search_text,
+        content='catalog_fieldfeaturevector',
+        content_rowid='field_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER catalog_field_fts_insert AFTER INSERT ON catalog_fieldfeaturevector BEGIN
+        INSERT INTO catalog_field_fts(rowid, search_text) VALUES (new.field_id, new.search_text);
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_field_fts_delete AFTER DELETE ON catalog_fieldfeaturevector BEGIN
+        INSERT INTO catalog_field_fts(catalog_field_fts, rowid, search_text) VALUES ('delete', old.field_id, old.search_text);
+    END
+    """,
+    """
+    CREATE TRIGGER catalog_field_fts_update AFTER UPDATE ON catalog_fieldfeaturevector BEGIN
+        INSERT INTO catalog_field_fts(catalog_field_fts, rowid, search_text) VALUES ('delete', old.field_id, old.search_text);
+        INSERT INTO catalog_field_fts(rowid, search_text) VALUES (new.field_id, new.search_text);
+    END
+    """,
+    "INSERT INTO catalog_field_fts(catalog_field_fts) VALUES ('rebuild')",
+]
+
+SQLITE_TEARDOWN = [
+    'DROP TRIGGER IF EXISTS catalog_field_fts_update',
+    'DROP TRIGGER IF EXISTS catalog_field_fts_delete',
+    'DROP TRIGGER IF EXISTS catalog_field_fts_insert',
+    'DROP TABLE IF EXISTS catalog_field_fts',
+]
+
+POSTGRESQL_SETUP = [
+    "CREATE INDEX catalog_field_search_gin ON catalog_fieldfeaturevector USING GIN (to_tsvector('simple', search_text))",
+]
+
+POSTGRESQL_TEARDOWN = [
+    'DROP INDEX IF EXISTS catalog_field_search_gin',
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_fieldfeaturevector'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'sqlite': SQLITE_SETUP, 'postgresql': POSTGRESQL_SETUP}),
+            run_for_vendor({'sqlite': SQLITE_TEARDOWN, 'postgresql': POSTGRESQL_TEARDOWN}),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_field_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', 'added_at', 'id'], name='catalog_fav_user_added_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='field',
+            index=models.Index(fields=['name', 'id'], name='catalog_field_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='institution',
+            index=models.Index(fields=['name', 'id'], name='catalog_institution_name_idx'),
+        ),
+    ]
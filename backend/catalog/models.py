@@ -11,6 +11,11 @@ class Institution(models.Model):
     logo = models.ImageField(upload_to='institution_logos/', null=True, blank=True)
     description = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='catalog_institution_name_idx'), # Keyset pagination key
+        ]
+
     def __str__(self):
         return self.name
 
@@ -24,6 +29,12 @@ class Field(models.Model):
     admission_criteria = models.TextField(blank=True)
     tuition_fees_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     tuition_fees_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='catalog_field_name_idx'), # Keyset pagination key
+        ]
+
     def __str__(self):
         return self.name
 
@@ -34,6 +45,21 @@ class Favorite(models.Model):
 
     class Meta:
         unique_together = ('user', 'field') # A user can favorite a field only once
+        indexes = [
+            models.Index(fields=['user', 'added_at', 'id'], name='catalog_fav_user_added_idx'), # Keyset pagination key
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} favorites {self.field.name}"
+
+class FieldFeatureVector(models.Model):
+    """
+    Precomputed index row of a Field, kept in sync by the signals in catalog/signals.py.
+    """
+    field = models.OneToOneField(Field, on_delete=models.CASCADE, primary_key=True, related_name='feature_vector')
+    vector = models.JSONField(default=list) # One weight per dimension of catalog.features.FEATURE_DIMENSIONS
+    search_text = models.TextField(blank=True) # Accent-folded text matched by catalog search
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
-        return f"{self.user.username} favorites {self.field.name}"
\ No newline at end of file
+        return f"Feature vector of {self.field_id}"
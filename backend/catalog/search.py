@@ -0,0 +1,92 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+
+from .features import fold_text
+
+# SQLite FTS5 table indexing catalog_fieldfeaturevector.search_text, see migration 0003
+FTS_TABLE = 'catalog_field_fts'
+
+MAX_TERMS = 8
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(query):
+    """
+    Splits a query into accent-folded terms ("Ingénierie civile" -> ['ingenierie', 'civile']).
+    """
+    return TOKEN_RE.findall(fold_text(query))[:MAX_TERMS]
+
+
+class BasicSearchBackend:
+    """
+    Fallback for databases without a full-text index: substring match on the folded index text.
+    """
+    def search(self, terms, limit):
+        from .models import FieldFeatureVector
+
+        queryset = FieldFeatureVector.objects.all()
+        for term in terms:
+            queryset = queryset.filter(search_text__contains=term)
+        return [(field_id, 0.0) for field_id in queryset.order_by('field_id').values_list('field_id', flat=True)[:limit]]
+
+
+class SQLiteSearchBackend:
+    """
+    FTS5 index kept in sync with catalog_fieldfeaturevector by triggers, ranked with bm25.
+    """
+    def search(self, terms, limit):
+        # Every term must match, the last one as a prefix so results follow the user's typing
+        match = ' '.join(f'"{term}"' for term in terms[:-1])
+        match = f'{match} "{terms[-1]}"*'.strip()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY 2, rowid LIMIT %s',
+                [match, limit],
+            )
+            # bm25 is lower for better matches, expose a score where higher is better
+            return [(field_id, -score) for field_id, score in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend:
+    """
+    tsvector search over the folded index text, served by the GIN expression index of migration 0003.
+    """
+    def search(self, terms, limit):
+        query = ' & '.join(f'{term}:*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT field_id, ts_rank(to_tsvector('simple', search_text), to_tsquery('simple', %s)) AS rank "
+                "FROM catalog_fieldfeaturevector "
+                "WHERE to_tsvector('simple', search_text) @@ to_tsquery('simple', %s) "
+                "ORDER BY rank DESC, field_id LIMIT %s",
+                [query, query, limit],
+            )
+            return cursor.fetchall()
+
+
+BACKENDS = {
+    'basic': BasicSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgreSQLSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Returns the backend named by settings.CATALOG_SEARCH_BACKEND, or the one matching the database.
+    """
+    name = getattr(settings, 'CATALOG_SEARCH_BACKEND', None) or connection.vendor
+    return BACKENDS.get(name, BasicSearchBackend)()
+
+
+def search_fields(query, limit=20):
+    """
+    Returns up to `limit` (field_id, score) pairs matching every term of `query`, best match first.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return []
+    return get_search_backend().search(terms, limit)
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.serializers import SparseFieldsetMixin
 from .models import Institution, Field, Favorite
 
 class InstitutionSerializer(serializers.ModelSerializer):
@@ -6,6 +7,11 @@ class InstitutionSerializer(serializers.ModelSerializer):
         model = Institution
         fields = '__all__'
 
+class InstitutionSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Institution
+        fields = ['id', 'name']
+
 class FieldSerializer(serializers.ModelSerializer):
     institutions = InstitutionSerializer(many=True, read_only=True) # Nested serializer for institutions
 
@@ -13,6 +19,17 @@ class FieldSerializer(serializers.ModelSerializer):
         model = Field
         fields = '__all__'
 
+class FieldListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    List representation of a Field: institutions are reduced to ids and names unless ?expand=institutions.
+    """
+    institutions = InstitutionSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Field
+        fields = '__all__'
+        expandable_fields = {'institutions': (InstitutionSerializer, {'many': True})}
+
 class FavoriteSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.username') # Display username instead of user id
     field_name = serializers.ReadOnlyField(source='field.name') # Display field name
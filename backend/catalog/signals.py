@@ -0,0 +1,74 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .autocomplete import bump_autocomplete_version
+from .caching import field_detail_cache, institution_detail_cache
+from .features import refresh_field_index
+from .models import Field, Institution
+
+
+def fields_changed(field_ids):
+    """
+    Refreshes everything derived from the given fields: index rows and cached detail payloads.
+    """
+    field_ids = list(field_ids)
+    refresh_field_index(field_ids)
+    field_detail_cache.invalidate(*field_ids)
+
+
+@receiver(post_save, sender=Field, dispatch_uid='catalog_index_field_saved')
+def index_saved_field(sender, instance, raw=False, **kwargs):
+    if raw: # Skip fixture loading, the index is rebuilt with `manage.py rebuild_field_index`
+        return
+    fields_changed([instance.pk])
+
+
+@receiver(post_delete, sender=Field, dispatch_uid='catalog_cache_field_deleted')
+def forget_deleted_field(sender, instance, **kwargs):
+    # The index row is removed by cascade
+    field_detail_cache.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=Field.institutions.through, dispatch_uid='catalog_index_institutions_changed')
+def index_changed_institutions(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # `pk_set` is not provided on clear, remember which fields lose this institution
+        instance._cleared_field_ids = list(instance.fields.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        fields_changed([instance.pk])
+    elif action == 'post_clear':
+        fields_changed(getattr(instance, '_cleared_field_ids', []))
+    else:
+        fields_changed(pk_set or [])
+
+
+@receiver(post_save, sender=Institution, dispatch_uid='catalog_index_institution_saved')
+def index_institution_fields(sender, instance, created, raw=False, **kwargs):
+    institution_detail_cache.invalidate(instance.pk)
+    # Institution names and cities are part of the search text of their fields
+    if created or raw:
+        return
+    fields_changed(instance.fields.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Institution, dispatch_uid='catalog_index_institution_deleting')
+def remember_institution_fields(sender, instance, **kwargs):
+    instance._indexed_field_ids = list(instance.fields.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Institution, dispatch_uid='catalog_index_institution_deleted')
+def index_orphaned_fields(sender, instance, **kwargs):
+    institution_detail_cache.invalidate(instance.pk)
+    fields_changed(getattr(instance, '_indexed_field_ids', []))
+
+
+@receiver(post_save, sender=Field, dispatch_uid='catalog_autocomplete_field_saved')
+@receiver(post_delete, sender=Field, dispatch_uid='catalog_autocomplete_field_deleted')
+@receiver(post_save, sender=Institution, dispatch_uid='catalog_autocomplete_institution_saved')
+@receiver(post_delete, sender=Institution, dispatch_uid='catalog_autocomplete_institution_deleted')
+def autocomplete_labels_changed(sender, **kwargs):
+    bump_autocomplete_version()
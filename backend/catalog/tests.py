@@ -1,3 +1,251 @@
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.testing import QueryBudgetMixin
+from .models import Field, FieldFeatureVector, Institution
+from .search import search_fields
+
+
+class FieldSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enspd = Institution.objects.create(name='ENSPD', city='Douala', type='public')
+        cls.civil = Field.objects.create(name='Génie Civil', description='Ingénierie des bâtiments et des routes', duration_years=5)
+        cls.software = Field.objects.create(name='Génie Logiciel', description='Ingenierie logicielle', duration_years=5)
+        cls.law = Field.objects.create(name='Droit', description='Droit public et privé', duration_years=4)
+        cls.law.institutions.add(cls.enspd)
+
+    def matching_ids(self, query):
+        return {field_id for field_id, score in search_fields(query)}
+
+    def test_accent_insensitive(self):
+        self.assertEqual(self.matching_ids('ingénierie'), {self.civil.pk, self.software.pk})
+        self.assertEqual(self.matching_ids('INGENIERIE'), {self.civil.pk, self.software.pk})
+
+    def test_all_terms_required_and_last_is_prefix(self):
+        self.assertEqual(self.matching_ids('genie bat'), {self.civil.pk})
+
+    def test_index_follows_catalog_writes(self):
+        self.assertEqual(self.matching_ids('douala'), {self.law.pk})
+        self.law.institutions.clear()
+        self.assertEqual(self.matching_ids('douala'), set())
+
+        self.civil.description = 'Travaux publics'
+        self.civil.save()
+        self.assertEqual(self.matching_ids('ingenierie'), {self.software.pk})
+
+        self.software.delete()
+        self.assertEqual(self.matching_ids('ingenierie'), set())
+
+    def test_search_endpoint(self):
+        response = APIClient().get(reverse('field-search'), {'q': 'génie'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(APIClient().get(reverse('field-search'), {'q': '"*'}).data['count'], 0)
+
+
+class FieldIndexSignalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enspd = Institution.objects.create(name='ENSPD', city='Douala', type='public')
+        cls.uy1 = Institution.objects.create(name='UY1', city='Yaoundé', type='public')
+        cls.civil = Field.objects.create(name='Génie Civil', description='Ingénierie des bâtiments', duration_years=5)
+        cls.law = Field.objects.create(name='Droit', description='Droit public', duration_years=4)
+        cls.civil.institutions.add(cls.enspd, cls.uy1)
+        cls.law.institutions.add(cls.enspd)
+
+    def search_text(self, field):
+        return FieldFeatureVector.objects.get(field=field).search_text
+
+    def test_rows_follow_field_writes(self):
+        self.assertIn('douala', self.search_text(self.civil))
+        self.assertEqual(FieldFeatureVector.objects.get(field=self.civil).vector, [1.0, 0.0, 0.0, 0.0])
+
+        self.civil.description = 'Travaux publics'
+        self.civil.required_skills = ['Mathématiques']
+        self.civil.save()
+        self.assertEqual(FieldFeatureVector.objects.get(field=self.civil).vector, [0.0, 1.0, 0.0, 0.0])
+
+        self.civil.delete()
+        self.assertFalse(FieldFeatureVector.objects.filter(field_id=self.civil.pk).exists())
+        self.assertTrue(FieldFeatureVector.objects.filter(field=self.law).exists())
+
+    def test_remove_and_clear_from_the_field(self):
+        self.civil.institutions.remove(self.enspd)
+        self.assertNotIn('douala', self.search_text(self.civil))
+        self.assertIn('yaounde', self.search_text(self.civil))
+
+        self.civil.institutions.clear()
+        self.assertNotIn('yaounde', self.search_text(self.civil))
+        self.assertIn('douala', self.search_text(self.law))
+
+    def test_remove_and_clear_from_the_institution(self):
+        self.enspd.fields.remove(self.law)
+        self.assertNotIn('douala', self.search_text(self.law))
+        self.assertIn('douala', self.search_text(self.civil))
+
+        self.enspd.fields.clear()
+        self.assertNotIn('douala', self.search_text(self.civil))
+        self.assertIn('yaounde', self.search_text(self.civil))
+
+    def test_institution_rename_and_delete(self):
+        self.enspd.city = 'Bonamoussadi'
+        self.enspd.save()
+        self.assertIn('bonamoussadi', self.search_text(self.civil))
+        self.assertIn('bonamoussadi', self.search_text(self.law))
+
+        self.enspd.delete()
+        self.assertNotIn('enspd', self.search_text(self.civil))
+        self.assertNotIn('enspd', self.search_text(self.law))
+        self.assertEqual(FieldFeatureVector.objects.count(), 2)
+
+
+class AutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enspd = Institution.objects.create(name='École Polytechnique', city='Douala', type='public')
+        cls.civil = Field.objects.create(name='Génie Civil', description='Bâtiments', duration_years=5)
+
+    def setUp(self):
+        cache.clear() # The writes of a previous test are rolled back, not its version bumps
+
+    def labels(self, query):
+        response = APIClient().get(reverse('autocomplete'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [(item['type'], item['label']) for item in response.data]
+
+    def test_prefixes(self):
+        self.assertEqual(self.labels('gen'), [('field', 'Génie Civil')])
+        self.assertEqual(self.labels('CIV'), [('field', 'Génie Civil')])
+        self.assertEqual(self.labels('ecole poly'), [('institution', 'École Polytechnique')])
+        self.assertEqual(self.labels('doua'), [('city', 'Douala')])
+        self.assertEqual(self.labels(''), [])
+
+    def test_rebuilt_on_catalog_writes(self):
+        self.assertEqual(self.labels('gen'), [('field', 'Génie Civil')])
+        Field.objects.create(name='Génie Logiciel', description='Programmation', duration_years=5)
+        self.civil.delete()
+        self.assertEqual(self.labels('gen'), [('field', 'Génie Logiciel')])
+
+    def test_write_unseen_by_this_process_expires(self):
+        self.assertEqual(self.labels('gen'), [('field', 'Génie Civil')])
+        # A rename by another process with a per-process cache: this one is not told
+        Field.objects.filter(pk=self.civil.pk).update(name='Génie Urbain')
+        self.assertEqual(self.labels('gen'), [('field', 'Génie Civil')])
+
+        later = time.time() + settings.AUTOCOMPLETE_MAX_AGE + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(self.labels('gen'), [('field', 'Génie Urbain')])
+
+
+class FieldPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(25):
+            Field.objects.create(name=f"Filière {index % 5}", description='Description', duration_years=3)
+
+    def test_keyset_pages_cover_every_field_once(self):
+        client = APIClient()
+        response = client.get(reverse('field-list-create'))
+        self.assertNotIn('count', response.data)
+        seen = [field['id'] for field in response.data['results']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            seen.extend(field['id'] for field in response.data['results'])
+        self.assertEqual(sorted(seen), sorted(Field.objects.values_list('id', flat=True)))
+
+        response = client.get(reverse('field-list-create'), {'include_count': 'true'})
+        self.assertEqual(response.data['count'], 25)
+
+    def test_page_numbers_still_supported(self):
+        response = APIClient().get(reverse('field-list-create'), {'page': 3, 'page_size': 10})
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 5)
+
+        response = APIClient().get(reverse('field-list-create'), {'ordering': 'tuition_fees_min'})
+        self.assertEqual(response.data['count'], 25)
+
+
+class FieldListSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        institution = Institution.objects.create(name='ENSPD', city='Douala', type='public', description='Grande école')
+        field = Field.objects.create(name='Génie Civil', description='Bâtiments', duration_years=5)
+        field.institutions.add(institution)
+
+    def test_slim_institutions_by_default(self):
+        response = APIClient().get(reverse('field-list-create'))
+        self.assertEqual(response.data['results'][0]['institutions'], [
+            {'id': Institution.objects.get().pk, 'name': 'ENSPD'}
+        ])
+
+    def test_expand_and_sparse_fields(self):
+        response = APIClient().get(reverse('field-list-create'), {'expand': 'institutions'})
+        self.assertEqual(response.data['results'][0]['institutions'][0]['city'], 'Douala')
+
+        response = APIClient().get(reverse('field-list-create'), {'fields': 'id,name'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name'})
+
+
+class DetailCacheTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.institution = Institution.objects.create(name='ENSPD', city='Douala', type='public')
+        cls.field = Field.objects.create(name='Génie Civil', description='Bâtiments', duration_years=5)
+        cls.field.institutions.add(cls.institution)
+
+    def test_field_detail_cached_until_catalog_write(self):
+        client = APIClient()
+        url = reverse('field-detail', args=[self.field.pk])
+        client.get(url)
+        with self.assertMaxQueries(0):
+            response = client.get(url)
+        self.assertEqual(response.data['institutions'][0]['name'], 'ENSPD')
+
+        self.institution.name = 'Polytechnique Douala'
+        self.institution.save()
+        self.assertEqual(client.get(url).data['institutions'][0]['name'], 'Polytechnique Douala')
+
+        self.field.institutions.clear()
+        self.assertEqual(client.get(url).data['institutions'], [])
+
+        self.field.delete()
+        self.assertEqual(client.get(url).status_code, 404)
+
+    def test_institution_detail_cached_until_write(self):
+        client = APIClient()
+        url = reverse('institution-detail', args=[self.institution.pk])
+        client.get(url)
+        with self.assertMaxQueries(0):
+            client.get(url)
+        self.institution.city = 'Yaoundé'
+        self.institution.save()
+        self.assertEqual(client.get(url).data['city'], 'Yaoundé')
+
+    def test_file_urls_follow_the_request_host_from_one_entry(self):
+        Institution.objects.filter(pk=self.institution.pk).update(logo='institution_logos/enspd.png')
+        client = APIClient()
+        url = reverse('field-detail', args=[self.field.pk])
+
+        def logo_url(host):
+            return client.get(url, HTTP_HOST=host).data['institutions'][0]['logo']
+
+        self.assertRegex(logo_url('api.example.cm'), r'^http://api\.example\.cm/.*institution_logos/enspd\.png$')
+        with self.assertMaxQueries(0):
+            self.assertRegex(logo_url('evil.example.com'), r'^http://evil\.example\.com/')
+        self.assertRegex(logo_url('api.example.cm'), r'^http://api\.example\.cm/')
 
-# Create your tests here.
+        response = client.get(reverse('institution-detail', args=[self.institution.pk]), HTTP_HOST='api.example.cm')
+        self.assertRegex(response.data['logo'], r'^http://api\.example\.cm/.*institution_logos/enspd\.png$')
@@ -3,6 +3,8 @@ from .views import (
     InstitutionListCreateAPIView,
     InstitutionDetailAPIView,
     FieldListCreateAPIView,
+    FieldSearchAPIView,
+    AutocompleteAPIView,
     FieldDetailAPIView,
     FavoriteListCreateAPIView,
     FavoriteDetailAPIView,
@@ -12,7 +14,9 @@ urlpatterns = [
     path('institutions/', InstitutionListCreateAPIView.as_view(), name='institution-list-create'),
     path('institutions/<int:pk>/', InstitutionDetailAPIView.as_view(), name='institution-detail'),
     path('fields/', FieldListCreateAPIView.as_view(), name='field-list-create'),
+    path('fields/search/', FieldSearchAPIView.as_view(), name='field-search'),
     path('fields/<int:pk>/', FieldDetailAPIView.as_view(), name='field-detail'),
+    path('autocomplete/', AutocompleteAPIView.as_view(), name='autocomplete'),
     path('favorites/', FavoriteListCreateAPIView.as_view(), name='favorite-list-create'),
     path('favorites/<int:pk>/', FavoriteDetailAPIView.as_view(), name='favorite-detail'),
 ]
\ No newline at end of file
@@ -1,22 +1,38 @@
 from rest_framework import generics, permissions, filters, status
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.db.models import Prefetch
 from django_filters.rest_framework import DjangoFilterBackend
+from .autocomplete import autocomplete
+from .caching import CachedRetrieveMixin, field_detail_cache, institution_detail_cache
+from .features import fold_text
 from .models import Institution, Field, Favorite
-from .serializers import InstitutionSerializer, FieldSerializer, FavoriteSerializer
+from .search import search_fields
+from .serializers import InstitutionSerializer, FieldSerializer, FieldListSerializer, FavoriteSerializer
 from accounts.permissions import IsAdmin, IsStudent # Import custom permissions
+from core.pagination import KeysetOrPagePagination
 
-class CustomPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 100
+class InstitutionPagination(KeysetOrPagePagination):
+    ordering = ('name', 'id')
+
+class FieldPagination(KeysetOrPagePagination):
+    ordering = ('name', 'id')
+
+class FavoritePagination(KeysetOrPagePagination):
+    ordering = ('-added_at', '-id')
+
+class FieldIndexSearchFilter(filters.SearchFilter):
+    """
+    Searches the precomputed, accent-folded text of catalog.FieldFeatureVector.
+    """
+    def get_search_terms(self, request):
+        return [fold_text(term) for term in super().get_search_terms(request)]
 
 class InstitutionListCreateAPIView(generics.ListCreateAPIView):
     queryset = Institution.objects.all()
     serializer_class = InstitutionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdmin] # Admin can create/list, others can only list
-    pagination_class = CustomPagination
+    pagination_class = InstitutionPagination
 
     def get_permissions(self):
         # Allow any authenticated user to list, but only admin to create
@@ -24,8 +40,10 @@ class InstitutionListCreateAPIView(generics.ListCreateAPIView):
             return [permissions.IsAuthenticated(), IsAdmin()]
         return [permissions.IsAuthenticatedOrReadOnly()]
 
-class InstitutionDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class InstitutionDetailAPIView(CachedRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Institution.objects.all()
+    detail_cache = institution_detail_cache
+    file_url_paths = ('logo',)
     serializer_class = InstitutionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdmin] # Admin can update/delete, others can only retrieve
 
@@ -39,19 +57,73 @@ class FieldListCreateAPIView(generics.ListCreateAPIView):
     queryset = Field.objects.all()
     serializer_class = FieldSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdmin]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FieldIndexSearchFilter, filters.OrderingFilter]
     filterset_fields = ['duration_years', 'institutions__city', 'institutions__type']
-    search_fields = ['name', 'description', 'career_opportunities', 'required_skills']
+    search_fields = ['feature_vector__search_text'] # name, description, career opportunities, skills and institutions
     ordering_fields = ['name', 'duration_years', 'tuition_fees_min']
-    pagination_class = CustomPagination
+    pagination_class = FieldPagination
 
     def get_permissions(self):
         if self.request.method == 'POST':
             return [permissions.IsAuthenticated(), IsAdmin()]
         return [permissions.IsAuthenticatedOrReadOnly()]
 
-class FieldDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Field.objects.all()
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return FieldListSerializer # Slim institutions, ?fields= and ?expand=institutions
+        return FieldSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        if not FieldListSerializer.wants_field(self.request, 'institutions'):
+            return queryset
+        if 'institutions' in FieldListSerializer.requested_expansions(self.request):
+            return queryset.prefetch_related('institutions')
+        return queryset.prefetch_related(Prefetch('institutions', queryset=Institution.objects.only('id', 'name')))
+
+class FieldSearchAPIView(APIView):
+    """
+    Ranked full-text search over the field index: ?q=<terms>&limit=<n>.
+    Accents and case are ignored and the last term matches as a prefix.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            limit = 20
+
+        matches = search_fields(query, limit=limit)
+        fields = Field.objects.prefetch_related('institutions').in_bulk([field_id for field_id, score in matches])
+        results = []
+        for field_id, score in matches:
+            if field_id in fields:
+                results.append(dict(FieldSerializer(fields[field_id], context={'request': request}).data, score=round(score, 6)))
+        return Response({"query": query, "count": len(results), "results": results}, status=status.HTTP_200_OK)
+
+class AutocompleteAPIView(APIView):
+    """
+    Typeahead suggestions over field names, institution names and cities: ?q=<prefix>&limit=<n>.
+    Returns only ids and labels, served from an in-memory prefix index.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        suggestions = autocomplete(request.query_params.get('q', ''), limit=limit)
+        return Response(suggestions, status=status.HTTP_200_OK)
+
+class FieldDetailAPIView(CachedRetrieveMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Field.objects.prefetch_related('institutions')
+    detail_cache = field_detail_cache
+    file_url_paths = ('institutions.logo',)
     serializer_class = FieldSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdmin]
 
@@ -63,7 +135,7 @@ class FieldDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
 class FavoriteListCreateAPIView(generics.ListCreateAPIView):
     serializer_class = FavoriteSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
-    pagination_class = CustomPagination
+    pagination_class = FavoritePagination
 
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user)
@@ -28,6 +28,19 @@ DEBUG = True
 
 FRONTEND_URL = 'https://projet-glo.vercel.app' # Default for local Angular dev
 
+# Seconds browsers and proxies may reuse the question bank before revalidating it with its ETag. Also bounds
+# how long another process can serve an old question bank after an edit when the cache is per process (locmem)
+QUESTION_BANK_MAX_AGE = 300
+
+# Seconds another process can suggest old catalog labels after a write when the cache is per process (locmem)
+AUTOCOMPLETE_MAX_AGE = 60
+
+# Queue test scoring instead of computing it in the request. Only enable it when at least one
+# `python manage.py run_scoring_worker` process runs next to the web server: without a worker, completed
+# tests stay pending. Clients must then poll the result (202 with `scoring_job`) until it is ready.
+# Jobs that failed MAX_ATTEMPTS times are queued again with `run_scoring_worker --retry-failed`.
+ORIENTATION_ASYNC_SCORING = os.getenv('ORIENTATION_ASYNC_SCORING', 'false').lower() == 'true'
+
 ALLOWED_HOSTS = ['*']
 IS_RENDER = os.getenv("RENDER", False)
 
@@ -63,22 +76,36 @@ SPECTACULAR_SETTINGS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler', # New
+    # Reverse proxies in front of the app (1 on Render), whose X-Forwarded-For entries identify clients
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    # Sliding windows of accounts.throttling, checked before any password hashing
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('LOGIN_IP_THROTTLE_RATE', '30/min'),
+        'login_username': os.getenv('LOGIN_USERNAME_THROTTLE_RATE', '10/min'),
+        'password_reset_ip': '10/hour',
+        'password_reset_email': '5/hour',
+    },
 }
 
 from datetime import timedelta
 
+# Seconds a user's active flag and role are cached per process by accounts.authentication
+AUTH_USER_STATUS_TTL = int(os.getenv('AUTH_USER_STATUS_TTL', 30))
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
-    'ROTATE_REFRESH_TOKENS': False,
-    'BLACKLIST_AFTER_ROTATION': False,
+    'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': True, # Rotated tokens are revoked in accounts.revocation, not the blacklist app
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.RevocableTokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'accounts.serializers.RevokeTokenSerializer',
     'UPDATE_LAST_LOGIN': False,
 
     'ALGORITHM': 'HS256',
@@ -106,6 +133,10 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Per-process Bloom filter in front of the revoked refresh tokens (see accounts/revocation.py)
+TOKEN_REVOCATION_FILTER_CAPACITY = int(os.getenv('TOKEN_REVOCATION_FILTER_CAPACITY', 1_000_000))
+TOKEN_REVOCATION_REFRESH_SECONDS = 5 # Delay before a process sees tokens revoked by the others
+
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware', # New
@@ -118,6 +149,20 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL, serializer and timing metrics: Server-Timing headers and /api/core/metrics/
+REQUEST_METRICS = os.getenv('REQUEST_METRICS', 'false').lower() == 'true'
+if REQUEST_METRICS:
+    MIDDLEWARE.insert(0, 'core.middleware.RequestMetricsMiddleware')
+
+# cProfile of requests sent with `X-Profile: 1` by an admin, or sampled, plus slow query logging
+REQUEST_PROFILING = os.getenv('REQUEST_PROFILING', 'false').lower() == 'true'
+PROFILING_APPS = ('orientation.', 'catalog.', 'accounts.') # Modules of the views that may be profiled
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SLOW_QUERY_MS = float(os.getenv('PROFILING_SLOW_QUERY_MS', '100'))
+PROFILING_KEEP = 20 # Profiles kept in memory per process
+if REQUEST_PROFILING:
+    MIDDLEWARE.append('core.middleware.ProfilingMiddleware')
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:4200", # The origin for your Angular app
     "https://projet-glo.vercel.app"
@@ -157,6 +202,55 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND selects local memory (dev default), a shared directory or a Redis server
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+}
+
+# Seconds a rendered catalog detail payload stays cached (writes invalidate it immediately)
+CATALOG_CACHE_TTL = {
+    'field': int(os.getenv('CATALOG_FIELD_CACHE_TTL', 600)),
+    'institution': int(os.getenv('CATALOG_INSTITUTION_CACHE_TTL', 3600)),
+}
+
+
+# Bulk user import. The upload endpoint (POST /api/accounts/admin/users/import/) imports inside the
+# request and hashes passwords inline, about 0.4 s each: it only takes small files. Whole cohorts go
+# through `manage.py import_users`, which hashes them in a process pool.
+USER_IMPORT_MAX_ROWS = 100
+USER_IMPORT_MAX_UPLOAD_SIZE = 1024 * 1024 # Bytes
+
+# Email, sent from the outbox by `manage.py send_queued_emails`
+# https://docs.djangoproject.com/en/5.2/topics/email/
+
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'false').lower() == 'true'
+EMAIL_TIMEOUT = 30
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', str(BASE_DIR / 'sent_emails')) # For the file backend
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'ENSPD Orientation <no-reply@enspd-orientation.cm>')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -233,6 +327,11 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': False,
         },
+        'core.profiling': { # Slow queries logged by core.middleware.ProfilingMiddleware
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
     'root': {  # NOUVEAU - pour capturer toutes les erreurs
         'handlers': ['console'],
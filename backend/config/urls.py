@@ -25,4 +25,5 @@ urlpatterns = [
     path('api/accounts/', include('accounts.urls')),
     path('api/catalog/', include('catalog.urls')),
     path('api/orientation/', include('orientation.urls')),
+    path('api/core/', include('core.urls')),
 ]
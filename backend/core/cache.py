@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'version:'
+
+
+def get_version(namespace, timeout=None):
+    """
+    Returns the current version of a cached namespace.
+
+    The version is shared by the processes only if they share the cache backend (redis, file).
+    With the default locmem backend every process has its own counter, and `bump_version` is seen
+    only by the process that called it. Namespaces read by several processes should then pass a
+    `timeout`: the counter expires and restarts from a new version, so the other processes serve
+    stale entries for at most `timeout` seconds.
+
+    A missing counter starts from the current time rather than 1, so a counter lost to eviction,
+    expiry or a cache restart can never come back to a version whose entries are still cached.
+    """
+    return cache.get_or_set(f'{VERSION_KEY_PREFIX}{namespace}', time.time_ns, timeout=timeout)
+
+
+def bump_version(namespace, timeout=None):
+    """
+    Invalidates every entry of a namespace by moving it to a new version. Pass the `timeout`
+    the namespace is read with, see `get_version`.
+    """
+    key = f'{VERSION_KEY_PREFIX}{namespace}'
+    try:
+        return cache.incr(key) # Keeps the expiry of the counter
+    except ValueError: # Counter not set yet
+        return get_version(namespace, timeout=timeout)
+
+
+class ReadThroughCache:
+    """
+    Per-object read-through cache on top of Django's cache framework.
+
+    Each object key has its own version counter, so `invalidate(key)` drops every variant
+    of an object at once and across processes.
+    """
+
+    # Every cache created, their hit/miss counters are exported by core.metrics
+    instances = []
+
+    def __init__(self, namespace, timeout):
+        ReadThroughCache.instances.append(self)
+        self.namespace = namespace
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _cache_key(self, key, variant):
+        version = get_version(f'{self.namespace}:{key}')
+        return f'{self.namespace}:{key}:{version}:{variant}'
+
+    def get(self, key, loader, variant=''):
+        """
+        Returns the cached value of `key`, calling `loader()` and caching its result on a miss.
+        A None result is returned but not cached.
+        """
+        cache_key = self._cache_key(key, variant)
+        value = cache.get(cache_key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            value = loader()
+            if value is not None:
+                cache.set(cache_key, value, self.timeout)
+        return value
+
+    def invalidate(self, *keys):
+        for key in keys:
+            bump_version(f'{self.namespace}:{key}')
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+class LocalTTLCache:
+    """
+    Small in-process LRU whose entries expire `ttl` seconds after being stored.
+
+    For values read on every request that may be slightly stale, e.g. per-user flags checked
+    by authentication. Invalidate explicitly in this process, others catch up within `ttl`.
+    """
+
+    _missing = object()
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, self._missing)
+            if entry is self._missing:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,33 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importing import IMPORT_FORMATS, UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Creates users from a CSV (with a header row) or JSON Lines file: username, email, first_name, last_name, role, password.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to jsonl for .jsonl/.ndjson files, csv otherwise.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows validated and inserted together.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes hashing the passwords.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+        try:
+            stream = open(path, encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+        self.stdout.write(self.style.NOTICE(f"Importing users from {path} with {options['workers']} workers..."))
+        with stream:
+            importer = UserImporter(batch_size=options['batch_size'], workers=options['workers'])
+            report = importer.run(read_rows(stream, file_format))
+
+        for error in report['errors']:
+            self.stdout.write(self.style.ERROR(f"Line {error['line']} ({error['username']}): {error['errors']}"))
+        style = self.style.SUCCESS if not report['errors'] else self.style.WARNING
+        self.stdout.write(style(f"{report['created']} users created, {len(report['errors'])} rows rejected."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import prune_expired
+
+
+class Command(BaseCommand):
+    help = 'Deletes the revoked refresh tokens that have expired. Meant to run on a schedule, e.g. daily.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows deleted per statement.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Pruning expired revoked tokens..."))
+        deleted = prune_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} expired revoked tokens deleted."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from catalog.features import rebuild_field_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the precomputed feature index of every catalog Field.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of fields indexed per query.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Rebuilding field index..."))
+        indexed = rebuild_field_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} fields."))
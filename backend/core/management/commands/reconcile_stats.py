@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the materialized admin dashboard statistics from the source tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows read per query when scanning recommendations.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Reconciling dashboard statistics..."))
+        counters = reconcile(batch_size=options['batch_size'])
+        for key, value in sorted(counters.items()):
+            self.stdout.write(f"{key}: {value}")
+        self.stdout.write(self.style.SUCCESS("Dashboard statistics reconciled."))
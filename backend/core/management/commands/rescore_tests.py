@@ -0,0 +1,51 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.stats import reconcile
+from orientation.models import OrientationTest
+from orientation.rescoring import rescore_tests
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the scores and recommendation of every completed orientation test.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Tests scored and written per batch.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Scoring processes, 1 scores inline.')
+        parser.add_argument('--checkpoint', help='File recording the last rescored test, resumed from when it exists.')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint and start over.')
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint']
+        start_after = 0
+        if checkpoint and not options['restart'] and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                start_after = json.load(f)['last_test_id']
+            self.stdout.write(self.style.NOTICE(f"Resuming after test {start_after}."))
+
+        total = OrientationTest.objects.filter(is_completed=True, pk__gt=start_after).count()
+        self.stdout.write(self.style.NOTICE(f"Rescoring {total} tests with {options['workers']} workers..."))
+        started = time.monotonic()
+        done = 0
+
+        def on_batch(last_test_id, count):
+            nonlocal done
+            done += count
+            if checkpoint:
+                with open(checkpoint, 'w') as f:
+                    json.dump({'last_test_id': last_test_id}, f)
+            rate = done / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(f"{done}/{total} tests ({rate:.0f}/s), last test {last_test_id}")
+
+        rescored = rescore_tests(
+            batch_size=options['batch_size'], workers=options['workers'], start_after=start_after, on_batch=on_batch
+        )
+
+        # Bulk writes skip the signals maintaining the dashboard counters
+        reconcile()
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(f"Rescored {rescored} tests in {time.monotonic() - started:.1f}s."))
@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from orientation.jobs import claim_jobs, requeue_failed_jobs, run_job
+
+
+def run_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        connection.close() # Each pool thread owns its own database connection
+
+
+class Command(BaseCommand):
+    help = 'Runs queued orientation scoring jobs. Start several workers to scale out.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Jobs run in parallel by this worker.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to wait when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit as soon as the queue is empty.')
+        parser.add_argument('--retry-failed', action='store_true', help='Queue the failed jobs again before starting.')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        if options['retry_failed']:
+            self.stdout.write(self.style.NOTICE(f"{requeue_failed_jobs()} failed jobs queued again."))
+        self.stdout.write(self.style.NOTICE(f"Scoring worker started with {concurrency} threads."))
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                close_old_connections()
+                jobs = claim_jobs(limit=concurrency)
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                for job in pool.map(run_in_thread, jobs):
+                    style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+                    self.stdout.write(style(f"Job {job.pk} (test {job.orientation_test_id}): {job.status}"))
+
+        self.stdout.write(self.style.NOTICE("Scoring worker stopped."))
@@ -0,0 +1,124 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User, StudentProfile
+from catalog.models import Institution, Field
+from core.synthetic import CHOICES, CITIES, SKILLS, SUBJECTS, random_answer
+from orientation.jobs import score_test, scoring_queryset
+from orientation.models import Question, OrientationTest, TestResponse
+from orientation.validation import get_answer_schemas
+from .seed_data import Command as SeedDataCommand
+
+# Password of every generated student, used by benchmarks/load_profile.py
+BENCHMARK_PASSWORD = 'bench123'
+
+CATEGORIES = [category for category, label in Question.CATEGORY_CHOICES]
+
+
+class Command(SeedDataCommand):
+    help = 'Seeds the development data plus benchmark students whose tests are scored like real submissions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Number of benchmark students.')
+        parser.add_argument('--fields', type=int, default=50, help='Number of benchmark fields.')
+        parser.add_argument('--institutions', type=int, default=20, help='Number of benchmark institutions.')
+        parser.add_argument('--questions', type=int, default=20, help='Number of benchmark questions.')
+        parser.add_argument('--tests-per-user', type=int, default=1, help='Completed tests of each student.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, the same seed generates the same data.')
+
+    def handle(self, *args, **options):
+        super().handle(*args, **options)
+        self.random = random.Random(options['seed'])
+
+        with transaction.atomic():
+            self.create_benchmark_questions(options['questions'])
+            institutions = self.create_benchmark_institutions(options['institutions'])
+            self.create_benchmark_fields(options['fields'], institutions)
+            students = self.create_benchmark_students(options['users'])
+        self.create_benchmark_tests(students, options['tests_per_user'])
+
+        self.stdout.write(self.style.SUCCESS("Benchmark data ready."))
+
+    def create_benchmark_questions(self, count):
+        self.stdout.write(self.style.NOTICE(f"Creating {count} benchmark questions..."))
+        for index in range(count):
+            question_type = ['likert', 'likert', 'mcq', 'ranking'][index % 4]
+            if question_type == 'likert':
+                options = [1, 2, 3, 4, 5]
+            elif question_type == 'mcq':
+                options = self.random.sample(CHOICES, 4)
+            else:
+                options = self.random.sample(CHOICES, 3)
+            Question.objects.get_or_create(
+                text=f"Question de référence {index + 1}",
+                defaults={'category': CATEGORIES[index % len(CATEGORIES)], 'question_type': question_type, 'options': options},
+            )
+
+    def create_benchmark_institutions(self, count):
+        self.stdout.write(self.style.NOTICE(f"Creating {count} benchmark institutions..."))
+        institutions = []
+        for index in range(count):
+            institution, _ = Institution.objects.get_or_create(
+                name=f"Institut de référence {index + 1}",
+                defaults={
+                    'city': self.random.choice(CITIES),
+                    'type': self.random.choice(['public', 'private']),
+                    'description': f"Établissement de {self.random.choice(CITIES)} généré pour les benchmarks.",
+                },
+            )
+            institutions.append(institution)
+        return institutions
+
+    def create_benchmark_fields(self, count, institutions):
+        self.stdout.write(self.style.NOTICE(f"Creating {count} benchmark fields..."))
+        for index in range(count):
+            subjects = self.random.sample(SUBJECTS, 3)
+            field, created = Field.objects.get_or_create(
+                name=f"{subjects[0]} et {subjects[1]} {index + 1}",
+                defaults={
+                    'description': f"Formation en {', '.join(subjects).lower()}.",
+                    'duration_years': self.random.choice([3, 5, 7]),
+                    'career_opportunities': [f"Spécialiste en {subject.lower()}" for subject in subjects],
+                    'required_skills': self.random.sample(SKILLS, 3),
+                    'tuition_fees_min': self.random.choice([50000, 100000, 250000]),
+                    'tuition_fees_max': self.random.choice([300000, 500000, 1000000]),
+                },
+            )
+            if created and institutions:
+                field.institutions.add(*self.random.sample(institutions, min(len(institutions), self.random.randint(1, 3))))
+
+    def create_benchmark_students(self, count):
+        self.stdout.write(self.style.NOTICE(f"Creating {count} benchmark students..."))
+        password = make_password(BENCHMARK_PASSWORD) # Hashed once, not once per student
+        existing = set(User.objects.filter(username__startswith='bench_student_').values_list('username', flat=True))
+        students = []
+        for index in range(count):
+            username = f'bench_student_{index + 1}'
+            if username in existing:
+                continue
+            student = User.objects.create(
+                username=username, email=f'{username}@enspd.cm', password=password, role='student',
+            )
+            StudentProfile.objects.create(user=student)
+            students.append(student)
+        return students
+
+    def create_benchmark_tests(self, students, tests_per_user):
+        self.stdout.write(self.style.NOTICE(f"Creating {len(students) * tests_per_user} completed tests..."))
+        questions = list(Question.objects.order_by('id'))
+        schemas = get_answer_schemas()
+        for student in students:
+            for _ in range(tests_per_user):
+                with transaction.atomic():
+                    orientation_test = OrientationTest.objects.create(user=student, is_completed=True, completed_at=timezone.now())
+                    answers = [(question, random_answer(question, self.random)) for question in questions]
+                    TestResponse.objects.bulk_create(
+                        TestResponse(orientation_test=orientation_test, question=question, answer=answer)
+                        for question, answer in answers
+                        if schemas[question.pk].error(answer) is None # Questions of the bank with unusable options
+                    )
+                    # Scored like a real submission, so recommendations and statistics are consistent
+                    score_test(scoring_queryset().get(pk=orientation_test.pk))
@@ -1,17 +1,31 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from accounts.models import User, StudentProfile
+from catalog.features import rebuild_field_index
 from catalog.models import Institution, Field
+from core.stats import reconcile
+from core.synthetic import SyntheticDataGenerator
 from orientation.models import Question
+from orientation.rescoring import rescore_tests
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Command(BaseCommand):
-    help = 'Seeds the database with initial data for development.'
+    help = 'Seeds the database with initial data for development, plus production-sized synthetic data with --scale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=0, help='Number of synthetic students to generate, with a catalog sized after them.')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed of the synthetic data, the same seed generates the same data.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows generated and inserted per query in --scale mode.')
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        self.seed_development_data()
+        if options.get('scale'):
+            self.seed_synthetic_data(options['scale'], options['seed'], options['batch_size'])
+
+    @transaction.atomic
+    def seed_development_data(self):
         self.stdout.write(self.style.NOTICE("Seeding database..."))
 
         # Clear existing data (optional, but good for consistent seeding)
@@ -23,6 +37,23 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS("Database seeding complete."))
 
+    def seed_synthetic_data(self, scale, seed, batch_size):
+        self.stdout.write(self.style.NOTICE(f"Generating synthetic data for {scale} students..."))
+        generator = SyntheticDataGenerator(scale, seed=seed, batch_size=batch_size, log=self.stdout.write)
+        try:
+            counts = generator.run()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for name, count in counts.items():
+            self.stdout.write(f"{name}: {count}")
+
+        # Bulk inserts skip the signals maintaining derived data, rebuild it in bulk too
+        self.stdout.write(self.style.NOTICE("Rebuilding field index, recommendations and statistics..."))
+        rebuild_field_index(batch_size=batch_size)
+        rescore_tests(batch_size=batch_size)
+        reconcile(batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated."))
+
     def clear_data(self):
         self.stdout.write(self.style.NOTICE("Clearing existing data..."))
         User.objects.all().delete()
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.outbox import claim_emails, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Sends the queued emails in batches, over one connection of the email backend per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Emails claimed and sent per connection.')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when the outbox is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit as soon as no email is due.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE("Email sender started."))
+        while True:
+            close_old_connections()
+            emails = claim_emails(limit=options['batch_size'])
+            if not emails:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+            send_batch(emails)
+            sent = sum(email.status == 'sent' for email in emails)
+            style = self.style.SUCCESS if sent == len(emails) else self.style.WARNING
+            self.stdout.write(style(f"{sent}/{len(emails)} emails sent."))
+        self.stdout.write(self.style.NOTICE("Email sender stopped."))
@@ -0,0 +1,196 @@
+import bisect
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+from .cache import ReadThroughCache
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# name: (help, buckets) of every histogram recorded per request
+HISTOGRAMS = {
+    'http_request_duration_seconds': ("Total time spent handling the request.", DURATION_BUCKETS),
+    'http_request_sql_queries': ("SQL queries run by the request.", QUERY_COUNT_BUCKETS),
+    'http_request_sql_duration_seconds': ("Time spent in SQL queries.", DURATION_BUCKETS),
+    'http_request_serializer_duration_seconds': ("Time spent producing serializer data.", DURATION_BUCKETS),
+    'http_response_size_bytes': ("Size of the response body.", SIZE_BUCKETS),
+}
+
+# name: help of the counters incremented outside of the request measurement, e.g. by throttles
+COUNTERS = {
+    'throttled_requests_total': "Requests rejected by a throttle, by scope.",
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return ','.join(f'{name}="{escape_label(value)}"' for name, value in labels)
+
+
+class MetricsRegistry:
+    """
+    In-process aggregation of request metrics, rendered in the Prometheus text format.
+
+    Each worker process has its own registry: scrape every process, or sum them on the Prometheus side.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.requests = {}
+        self.counters = {}
+
+    def record(self, labels, status_code, values):
+        """
+        Records one request: `labels` as ((name, value), ...) and {histogram name: observed value}.
+        """
+        with self._lock:
+            key = labels + (('status', status_code),)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            for name, value in values.items():
+                histogram = self.histograms.get((name, labels))
+                if histogram is None:
+                    histogram = self.histograms[(name, labels)] = Histogram(HISTOGRAMS[name][1])
+                histogram.observe(value)
+
+    def increment(self, name, labels):
+        with self._lock:
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.requests.clear()
+            self.counters.clear()
+
+    def render(self):
+        lines = [
+            '# HELP http_requests_total Requests handled, by view, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        with self._lock:
+            for labels, count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{format_labels(labels)}}} {count}')
+
+            for name, (help_text, buckets) in HISTOGRAMS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+                for (histogram_name, labels), histogram in sorted(self.histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*buckets, '+Inf'), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{format_labels(labels + (("le", bound),))}}} {cumulative}')
+                    lines.append(f'{name}_sum{{{format_labels(labels)}}} {histogram.sum}')
+                    lines.append(f'{name}_count{{{format_labels(labels)}}} {histogram.count}')
+
+            for name, help_text in COUNTERS.items():
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (counter_name, labels), count in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f'{name}{{{format_labels(labels)}}} {count}')
+
+        lines += [
+            '# HELP cache_requests_total Read-through cache lookups, by cache and result.',
+            '# TYPE cache_requests_total counter',
+        ]
+        for read_through_cache in ReadThroughCache.instances:
+            for result, count in read_through_cache.stats().items():
+                labels = (('cache', read_through_cache.namespace), ('result', result))
+                lines.append(f'cache_requests_total{{{format_labels(labels)}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+class RequestMetrics:
+    """
+    Measurements of the request being handled, see `current_request_metrics`.
+    """
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper() for the duration of the request
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.sql_count += 1
+
+
+_current = ContextVar('request_metrics', default=None)
+
+
+def current_request_metrics():
+    return _current.get()
+
+
+@contextmanager
+def measure_request():
+    """
+    Collects the RequestMetrics of the code run inside the block, SQL queries included.
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics.sql_wrapper))
+            yield metrics
+    finally:
+        _current.reset(token)
+
+
+_serializer_data = BaseSerializer.data
+
+
+def _timed_serializer_data(self):
+    metrics = _current.get()
+    # Nested serializers are rendered inside the outer one's time
+    if metrics is None or metrics.serializer_depth:
+        return _serializer_data.fget(self)
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        return _serializer_data.fget(self)
+    finally:
+        metrics.serializer_time += time.perf_counter() - started
+        metrics.serializer_depth -= 1
+
+
+def install_serializer_timing():
+    """
+    Times `serializer.data` of every DRF serializer (Serializer and ListSerializer go through
+    BaseSerializer.data). Outside of an instrumented request the overhead is a context variable lookup.
+    """
+    BaseSerializer.data = property(_timed_serializer_data)
@@ -0,0 +1,125 @@
+import cProfile
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from accounts.authentication import ClaimsJWTAuthentication
+from .metrics import install_serializer_timing, measure_request, registry
+from .profiling import ProfileRecord, SlowQueryLogger, profiler_lock, store
+
+
+class RequestMetricsMiddleware:
+    """
+    Measures every request: SQL query count and time, serializer time, total time and response size.
+
+    The measurements are returned in a Server-Timing header (shown by browser dev tools) and
+    aggregated per URL name for the admin metrics endpoint (core.views.MetricsView).
+    Opt-in with REQUEST_METRICS=true, see settings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_serializer_timing()
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with measure_request() as metrics:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        size = 0 if response.streaming else len(response.content)
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={metrics.sql_time * 1000:.1f};desc="{metrics.sql_count} queries"',
+            f'serialize;dur={metrics.serializer_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+        match = request.resolver_match
+        view = (match.view_name if match else None) or 'unmatched'
+        registry.record((('view', view), ('method', request.method)), response.status_code, {
+            'http_request_duration_seconds': total,
+            'http_request_sql_queries': metrics.sql_count,
+            'http_request_sql_duration_seconds': metrics.sql_time,
+            'http_request_serializer_duration_seconds': metrics.serializer_time,
+            'http_response_size_bytes': size,
+        })
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests to the views of PROFILING_APPS with cProfile, and logs their slow SQL queries.
+
+    A request is profiled when an administrator sends the `X-Profile: 1` header, or at random for
+    PROFILING_SAMPLE_RATE of the requests. The profile id is returned in `X-Profile-Id`, the last
+    PROFILING_KEEP profiles are listed and downloadable from /api/core/profiles/.
+    Opt-in with REQUEST_PROFILING=true, see settings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.apps = tuple(settings.PROFILING_APPS)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_query_threshold = settings.PROFILING_SLOW_QUERY_MS / 1000
+
+    def __call__(self, request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.get_response(request)
+        if not match.func.__module__.startswith(self.apps):
+            return self.get_response(request)
+
+        slow_queries = SlowQueryLogger(self.slow_query_threshold, ignored_files=(__file__,))
+        profile = None
+        if self.should_profile(request) and profiler_lock.acquire(blocking=False):
+            profile = cProfile.Profile()
+
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(slow_queries))
+                if profile is None:
+                    return self.get_response(request)
+                profile.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profile.disable()
+        finally:
+            if profile is not None:
+                profiler_lock.release()
+
+        record = ProfileRecord(request, response, time.perf_counter() - started, profile, slow_queries.slow_queries)
+        store.add(record)
+        response['X-Profile-Id'] = str(record.id)
+        return response
+
+    def should_profile(self, request):
+        if request.headers.get('X-Profile') == '1':
+            return is_admin_request(request)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+
+def is_admin_request(request):
+    """
+    Authenticates the request's bearer token ahead of DRF, or its session, and checks for an administrator.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = ClaimsJWTAuthentication().authenticate(Request(request))
+        except (AuthenticationFailed, InvalidToken):
+            return False
+        if result is None:
+            return False
+        user = result[0]
+    return user.is_authenticated and (user.role == 'admin' or user.is_superuser)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from core.stats import reconcile
+
+
+def build_counters(apps, schema_editor):
+    reconcile(apps)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('catalog', '0004_pagination_indexes'),
+        ('orientation', '0002_unique_test_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldStat',
+            fields=[
+                ('field', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='catalog.field')),
+                ('recommended_count', models.BigIntegerField(db_index=True, default=0)),
+                ('favorite_count', models.BigIntegerField(db_index=True, default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
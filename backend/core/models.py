@@ -1,3 +1,25 @@
 from django.db import models
 
-# Create your models here.
+
+class StatCounter(models.Model):
+    """
+    Materialized dashboard counter, maintained incrementally by core/signals.py.
+    Keys: 'users', 'users:role:<role>', 'tests:started', 'tests:completed', 'fields', 'institutions'.
+    """
+    key = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key} = {self.value}"
+
+
+class FieldStat(models.Model):
+    """
+    How many recommendations and favorites point to a field, for the dashboard's top-N lists.
+    """
+    field = models.OneToOneField('catalog.Field', on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    recommended_count = models.BigIntegerField(default=0, db_index=True)
+    favorite_count = models.BigIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"Stats of {self.field_id}"
@@ -0,0 +1,94 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+class PagePagination(PageNumberPagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination: each page is an indexed range scan after the previous one, no OFFSET.
+    The total is only computed when asked for with ?include_count=true.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    count_query_param = 'include_count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None
+        if request.query_params.get(self.count_query_param, '').lower() in ('1', 'true'):
+            self.count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload = {'count': self.count, **payload}
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'example': 123}
+        return response_schema
+
+
+class KeysetOrPagePagination(BasePagination):
+    """
+    Keyset pagination by default, page-number pagination for requests using the ?page= parameter.
+
+    Subclasses declare a stable `ordering` ending with a unique key, backed by a database index.
+    Orderings on nullable columns (e.g. ?ordering=tuition_fees_min) also fall back to page numbers,
+    since a keyset cursor cannot step over NULL values.
+    """
+    ordering = ('-pk',)
+    page_size = 10
+
+    def get_delegate(self, request, queryset, view):
+        keyset = KeysetPagination()
+        keyset.ordering = self.ordering
+        keyset.page_size = self.page_size
+        if 'page' in request.query_params or self.has_nullable_ordering(keyset, request, queryset, view):
+            paginator = PagePagination()
+            paginator.page_size = self.page_size
+            return paginator
+        return keyset
+
+    def has_nullable_ordering(self, keyset, request, queryset, view):
+        for name in keyset.get_ordering(request, queryset, view):
+            try:
+                if queryset.model._meta.get_field(name.lstrip('-')).null:
+                    return True
+            except FieldDoesNotExist:
+                continue
+        return False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.delegate = self.get_delegate(request, queryset, view)
+        if isinstance(self.delegate, PagePagination) and not queryset.ordered:
+            queryset = queryset.order_by(*self.ordering)
+        return self.delegate.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.delegate.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return KeysetPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        keyset = KeysetPagination()
+        keyset.ordering = self.ordering
+        parameters = keyset.get_schema_operation_parameters(view)
+        names = {parameter['name'] for parameter in parameters}
+        return parameters + [
+            parameter for parameter in PagePagination().get_schema_operation_parameters(view)
+            if parameter['name'] not in names
+        ]
@@ -0,0 +1,133 @@
+import io
+import itertools
+import logging
+import marshal
+import os
+import pstats
+import sysconfig
+import threading
+import time
+import traceback
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Frames from these directories are skipped when looking for the code that ran a query,
+# even when a virtualenv lives inside the project
+_LIBRARY_PATHS = tuple({sysconfig.get_paths()[name] for name in ('stdlib', 'purelib', 'platlib')})
+_PROJECT_ROOT = str(settings.BASE_DIR)
+
+
+def call_site(ignored_files=()):
+    """
+    Returns "path:line in function" of the innermost project frame of the current stack.
+    """
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = frame.filename
+        if filename.startswith(_PROJECT_ROOT) and not filename.startswith(_LIBRARY_PATHS) and filename not in ignored_files:
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return 'unknown'
+
+
+class SlowQueryLogger:
+    """
+    connection.execute_wrapper() logging the statements slower than `threshold` seconds with their call site.
+    Frames of `ignored_files` (e.g. the middleware installing the wrapper) are not reported as call sites.
+    """
+
+    def __init__(self, threshold, ignored_files=()):
+        self.threshold = threshold
+        self.ignored_files = (__file__, *ignored_files)
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            if duration >= self.threshold:
+                site = call_site(self.ignored_files)
+                self.slow_queries.append({'sql': sql, 'duration_ms': round(duration * 1000, 2), 'call_site': site})
+                logger.warning("Slow query (%.1f ms) at %s: %s", duration * 1000, site, sql)
+
+
+class ProfileRecord:
+    def __init__(self, request, response, duration, profile, slow_queries):
+        self.id = next(_ids)
+        self.created_at = timezone.now()
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.view = request.resolver_match.view_name if request.resolver_match else None
+        self.status_code = response.status_code
+        self.duration_ms = round(duration * 1000, 2)
+        self.slow_queries = slow_queries
+        profile.create_stats()
+        self.stats = profile.stats # pstats data, dumped in the .prof format on download
+
+    def dump(self):
+        """
+        The profile in the binary format of cProfile, readable with pstats or snakeviz.
+        """
+        return marshal.dumps(self.stats)
+
+    def summary(self, limit=15):
+        """
+        The `limit` functions with the highest cumulative time, as text.
+        """
+        stream = io.StringIO()
+        stats = pstats.Stats(stream=stream)
+        stats.stats = self.stats
+        stats.get_top_level_stats()
+        stats.sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'created_at': self.created_at,
+            'method': self.method,
+            'path': self.path,
+            'view': self.view,
+            'status_code': self.status_code,
+            'duration_ms': self.duration_ms,
+            'slow_queries': self.slow_queries,
+        }
+
+
+_ids = itertools.count(1)
+
+
+class ProfileStore:
+    """
+    The last `size` profiles taken by this process.
+    """
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=size)
+
+    def add(self, record):
+        with self._lock:
+            self._profiles.append(record)
+
+    def get(self, profile_id):
+        with self._lock:
+            return next((record for record in self._profiles if record.id == profile_id), None)
+
+    def all(self):
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+store = ProfileStore(getattr(settings, 'PROFILING_KEEP', 20))
+
+# cProfile cannot run twice at once in a process: concurrent requests skip profiling
+profiler_lock = threading.Lock()
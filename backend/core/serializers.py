@@ -0,0 +1,48 @@
+def parse_field_list(value):
+    return {name.strip() for name in (value or '').split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    Lets API clients shape a serializer's output through query parameters:
+
+    - `?fields=id,name` keeps only the listed fields;
+    - `?expand=institutions` swaps a slim field declared in `Meta.expandable_fields`
+      (`{'name': (SerializerClass, {kwargs})}`) for its full nested representation.
+
+    Only applies to the top-level serializer of a request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+
+        expand = self.requested_expansions(request)
+        for name, (serializer_class, options) in getattr(self.Meta, 'expandable_fields', {}).items():
+            if name in expand:
+                self.fields[name] = serializer_class(read_only=True, **options)
+
+        requested = self.requested_fields(request)
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+    @classmethod
+    def requested_fields(cls, request):
+        """
+        Returns the set of fields asked for with ?fields=, or None when the client wants them all.
+        """
+        return parse_field_list(request.query_params.get('fields')) or None
+
+    @classmethod
+    def requested_expansions(cls, request):
+        return parse_field_list(request.query_params.get('expand'))
+
+    @classmethod
+    def wants_field(cls, request, name):
+        if request is None:
+            return True
+        requested = cls.requested_fields(request)
+        return requested is None or name in requested
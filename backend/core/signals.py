@@ -0,0 +1,126 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from catalog.models import Favorite, Field, Institution
+from orientation.models import OrientationTest, Recommendation
+from .models import FieldStat
+from .stats import increment, increment_field_stats
+
+# Each tracked model remembers, at load time, the values its counters were computed from,
+# so a save can adjust the counters by the difference without re-reading the row.
+# Deferred values are remembered as None and never loaded here; `reconcile_stats` repairs
+# the rare counter that cannot be adjusted because of them.
+
+
+def loaded_value(instance, name):
+    if name in instance.get_deferred_fields():
+        return None
+    return getattr(instance, name)
+
+
+def recommended_field_ids(recommendation):
+    return {field_id for field_id in recommendation.recommended_fields or [] if isinstance(field_id, int)}
+
+
+@receiver(post_init, sender=User, dispatch_uid='core_stats_user_loaded')
+def remember_user_role(sender, instance, **kwargs):
+    instance._stats_role = loaded_value(instance, 'role')
+
+
+@receiver(post_save, sender=User, dispatch_uid='core_stats_user_saved')
+def count_saved_user(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        increment('users')
+        increment(f'users:role:{instance.role}')
+    elif instance._stats_role is not None and loaded_value(instance, 'role') not in (None, instance._stats_role):
+        increment(f'users:role:{instance._stats_role}', -1)
+        increment(f'users:role:{instance.role}')
+    instance._stats_role = loaded_value(instance, 'role')
+
+
+@receiver(post_delete, sender=User, dispatch_uid='core_stats_user_deleted')
+def count_deleted_user(sender, instance, **kwargs):
+    increment('users', -1)
+    if instance._stats_role is not None:
+        increment(f'users:role:{instance._stats_role}', -1)
+
+
+@receiver(post_init, sender=OrientationTest, dispatch_uid='core_stats_test_loaded')
+def remember_test_completion(sender, instance, **kwargs):
+    instance._stats_completed = loaded_value(instance, 'is_completed')
+
+
+@receiver(post_save, sender=OrientationTest, dispatch_uid='core_stats_test_saved')
+def count_saved_test(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        increment('tests:started')
+    is_completed = loaded_value(instance, 'is_completed')
+    if is_completed is not None and (created or instance._stats_completed is not None):
+        if is_completed != (instance._stats_completed and not created):
+            increment('tests:completed', 1 if is_completed else -1)
+    instance._stats_completed = is_completed
+
+
+@receiver(post_delete, sender=OrientationTest, dispatch_uid='core_stats_test_deleted')
+def count_deleted_test(sender, instance, **kwargs):
+    increment('tests:started', -1)
+    if instance._stats_completed:
+        increment('tests:completed', -1)
+
+
+@receiver(post_init, sender=Recommendation, dispatch_uid='core_stats_recommendation_loaded')
+def remember_recommended_fields(sender, instance, **kwargs):
+    if not instance.pk:
+        instance._stats_field_ids = set()
+    elif 'recommended_fields' in instance.get_deferred_fields():
+        instance._stats_field_ids = None
+    else:
+        instance._stats_field_ids = recommended_field_ids(instance)
+
+
+@receiver(post_save, sender=Recommendation, dispatch_uid='core_stats_recommendation_saved')
+def count_recommended_fields(sender, instance, raw=False, **kwargs):
+    if raw or instance._stats_field_ids is None or 'recommended_fields' in instance.get_deferred_fields():
+        return
+    field_ids = recommended_field_ids(instance)
+    increment_field_stats(instance._stats_field_ids - field_ids, 'recommended_count', -1)
+    increment_field_stats(field_ids - instance._stats_field_ids, 'recommended_count')
+    instance._stats_field_ids = field_ids
+
+
+@receiver(post_delete, sender=Recommendation, dispatch_uid='core_stats_recommendation_deleted')
+def uncount_recommended_fields(sender, instance, **kwargs):
+    if instance._stats_field_ids is None:
+        return
+    increment_field_stats(instance._stats_field_ids, 'recommended_count', -1)
+
+
+@receiver(post_save, sender=Favorite, dispatch_uid='core_stats_favorite_saved')
+def count_favorite(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        increment_field_stats([instance.field_id], 'favorite_count')
+
+
+@receiver(post_delete, sender=Favorite, dispatch_uid='core_stats_favorite_deleted')
+def uncount_favorite(sender, instance, **kwargs):
+    increment_field_stats([instance.field_id], 'favorite_count', -1)
+
+
+@receiver(post_save, sender=Field, dispatch_uid='core_stats_field_saved')
+@receiver(post_save, sender=Institution, dispatch_uid='core_stats_institution_saved')
+def count_catalog_entry(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        increment('fields' if sender is Field else 'institutions')
+        if sender is Field:
+            FieldStat.objects.create(field=instance)
+
+
+@receiver(post_delete, sender=Field, dispatch_uid='core_stats_field_deleted')
+@receiver(post_delete, sender=Institution, dispatch_uid='core_stats_institution_deleted')
+def uncount_catalog_entry(sender, **kwargs):
+    increment('fields' if sender is Field else 'institutions', -1)
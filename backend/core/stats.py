@@ -0,0 +1,119 @@
+from collections import Counter
+
+from django.apps import apps as global_apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+TOP_FIELDS_LIMIT = 10
+
+
+def increment(key, delta=1):
+    from .models import StatCounter
+
+    if not delta:
+        return
+    if StatCounter.objects.filter(key=key).update(value=F('value') + delta):
+        return
+    try:
+        with transaction.atomic():
+            StatCounter.objects.create(key=key, value=delta)
+    except IntegrityError: # Created concurrently
+        StatCounter.objects.filter(key=key).update(value=F('value') + delta)
+
+
+def increment_field_stats(field_ids, column, delta=1):
+    """
+    Adds `delta` to `column` ('recommended_count' or 'favorite_count') of each field, in one query.
+    FieldStat rows are created with their Field (or by `reconcile`).
+    """
+    from .models import FieldStat
+
+    field_ids = set(field_ids)
+    if not field_ids or not delta:
+        return
+    FieldStat.objects.filter(field_id__in=field_ids).update(**{column: F(column) + delta})
+
+
+def read_dashboard_stats(top=TOP_FIELDS_LIMIT):
+    """
+    Returns the admin dashboard statistics from the materialized counters, without scanning any table.
+    """
+    from .models import FieldStat, StatCounter
+
+    counters = dict(StatCounter.objects.values_list('key', 'value'))
+    users_by_role = [
+        {'role': key.split(':', 2)[2], 'count': value}
+        for key, value in sorted(counters.items()) if key.startswith('users:role:') and value
+    ]
+
+    def top_fields(column):
+        rows = (
+            FieldStat.objects.filter(**{f'{column}__gt': 0})
+            .order_by(f'-{column}', 'field_id')
+            .values_list('field_id', 'field__name', column)[:top]
+        )
+        return [{'id': field_id, 'name': name, 'count': count} for field_id, name, count in rows]
+
+    return {
+        "total_users": counters.get('users', 0),
+        "users_by_role": users_by_role,
+        "total_tests_completed": counters.get('tests:completed', 0),
+        "tests_started": counters.get('tests:started', 0),
+        "total_academic_fields": counters.get('fields', 0),
+        "total_institutions": counters.get('institutions', 0),
+        "top_recommended_fields": top_fields('recommended_count'),
+        "top_favorited_fields": top_fields('favorite_count'),
+    }
+
+
+def reconcile(apps=global_apps, batch_size=2000):
+    """
+    Recomputes every counter from the source tables. Returns the new {key: value} counters.
+
+    Takes an app registry so data migrations can run it against historical models.
+    """
+    User = apps.get_model('accounts', 'User')
+    OrientationTest = apps.get_model('orientation', 'OrientationTest')
+    Recommendation = apps.get_model('orientation', 'Recommendation')
+    Field = apps.get_model('catalog', 'Field')
+    Institution = apps.get_model('catalog', 'Institution')
+    Favorite = apps.get_model('catalog', 'Favorite')
+    StatCounter = apps.get_model('core', 'StatCounter')
+    FieldStat = apps.get_model('core', 'FieldStat')
+
+    counters = {
+        'users': User.objects.count(),
+        'tests:started': OrientationTest.objects.count(),
+        'tests:completed': OrientationTest.objects.filter(is_completed=True).count(),
+        'fields': Field.objects.count(),
+        'institutions': Institution.objects.count(),
+    }
+    for role, count in User.objects.values_list('role').annotate(count=Count('pk')).order_by():
+        counters[f'users:role:{role}'] = count
+
+    try:
+        RecommendationItem = apps.get_model('orientation', 'RecommendationItem')
+    except LookupError: # Historical app registry from before normalized recommendations
+        recommended = Counter()
+        rows = Recommendation.objects.values_list('recommended_fields', flat=True)
+        for field_ids in rows.iterator(chunk_size=batch_size):
+            recommended.update({field_id for field_id in field_ids or [] if isinstance(field_id, int)})
+    else:
+        recommended = Counter(dict(
+            RecommendationItem.objects.values_list('field_id').annotate(count=Count('recommendation_id', distinct=True)).order_by()
+        ))
+    favorited = dict(Favorite.objects.values_list('field_id').annotate(count=Count('pk')).order_by())
+
+    field_ids = Field.objects.values_list('pk', flat=True)
+    with transaction.atomic():
+        StatCounter.objects.all().delete()
+        StatCounter.objects.bulk_create([StatCounter(key=key, value=value) for key, value in counters.items()])
+        FieldStat.objects.all().delete()
+        FieldStat.objects.bulk_create(
+            (
+                FieldStat(field_id=field_id, recommended_count=recommended[field_id], favorite_count=favorited.get(field_id, 0))
+                for field_id in field_ids.iterator(chunk_size=batch_size)
+            ),
+            batch_size=batch_size,
+        )
+    return counters
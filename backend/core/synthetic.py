@@ -0,0 +1,190 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User, StudentProfile
+from catalog.models import Favorite, Field, Institution
+from orientation.models import OrientationTest, Question, TestResponse
+
+# Password of every synthetic user, hashed once
+SYNTHETIC_PASSWORD = 'synthetic123'
+
+USERNAME_PREFIX = 'synth_'
+
+CITIES = ['Douala', 'Yaoundé', 'Buea', 'Bafoussam', 'Garoua', 'Dschang', 'Ngaoundéré', 'Maroua', 'Bamenda', 'Kribi']
+
+SUBJECTS = [
+    'Sciences', 'Mathématiques', 'Physique', 'Chimie', 'Biologie', 'Informatique', 'Génie', 'Économie',
+    'Gestion', 'Droit', 'Lettres', 'Langues', 'Arts', 'Design', 'Histoire', 'Géographie', 'Santé', 'Agronomie',
+]
+
+SKILLS = ['Logique', 'Mathématiques', 'Analyse', 'Communication', 'Créativité', 'Rigueur', 'Empathie', 'Leadership']
+
+CHOICES = [
+    'Sciences (maths, physique, chimie)', 'Littérature et langues', 'Arts et design',
+    'Économie et gestion', 'Histoire et géographie', 'Résoudre des problèmes de maths',
+]
+
+
+def random_answer(question, rng):
+    """
+    A valid answer to `question` (see orientation.validation), drawn from `rng`.
+    """
+    if question.question_type == 'likert':
+        return rng.choice(question.options or [1, 2, 3, 4, 5])
+    labels = [option['label'] if isinstance(option, dict) else option for option in question.options or []]
+    if question.question_type == 'ranking':
+        return rng.sample(labels, len(labels))
+    return rng.choice(labels) if labels else ''
+
+
+class SyntheticDataGenerator:
+    """
+    Generates `scale` students with their tests, answers and favorites, over a catalog sized after them.
+
+    Rows are generated and bulk inserted one batch at a time, so memory stays bounded whatever the
+    scale. Every batch draws from its own generator seeded with (seed, kind, batch), so the same
+    seed always produces the same data. Bulk inserts send no model signals: the field index, the
+    recommendations and the dashboard counters must be rebuilt afterwards.
+    """
+
+    def __init__(self, scale, seed=42, batch_size=2000, questions=20, log=None):
+        self.scale = scale
+        self.seed = seed
+        self.batch_size = batch_size
+        self.question_count = questions
+        self.log = log or (lambda message: None)
+        self.field_count = max(20, scale // 200)
+        self.institution_count = max(5, self.field_count // 4)
+        self.now = timezone.now()
+
+    def rng(self, kind, batch=0):
+        return random.Random(f'{self.seed}:{kind}:{batch}')
+
+    def batches(self, count):
+        for batch, start in enumerate(range(0, count, self.batch_size)):
+            yield batch, range(start, min(start + self.batch_size, count))
+
+    def run(self):
+        """
+        Generates everything, returns the number of rows created per model.
+        """
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise ValueError("Synthetic data already exists, flush the database before generating it again.")
+        self.counts = dict.fromkeys(['questions', 'institutions', 'fields', 'students', 'tests', 'responses', 'favorites'], 0)
+        questions = self.create_questions()
+        institution_ids = self.create_institutions()
+        field_ids = self.create_fields(institution_ids)
+        self.create_students(questions, field_ids)
+        return self.counts
+
+    def create_questions(self):
+        # Few rows, created one by one so the question bank caches are invalidated by the signals
+        rng = self.rng('questions')
+        categories = [category for category, label in Question.CATEGORY_CHOICES]
+        for index in range(self.question_count):
+            question_type = ['likert', 'likert', 'mcq', 'ranking'][index % 4]
+            options = [1, 2, 3, 4, 5] if question_type == 'likert' else rng.sample(CHOICES, 4 if question_type == 'mcq' else 3)
+            _, created = Question.objects.get_or_create(
+                text=f"Question synthétique {index + 1}",
+                defaults={'category': categories[index % len(categories)], 'question_type': question_type, 'options': options},
+            )
+            self.counts['questions'] += created
+        return list(Question.objects.order_by('id'))
+
+    def create_institutions(self):
+        self.log(f"Creating {self.institution_count} institutions...")
+        ids = []
+        for batch, indexes in self.batches(self.institution_count):
+            rng = self.rng('institutions', batch)
+            institutions = Institution.objects.bulk_create([
+                Institution(
+                    name=f"Institut synthétique {index + 1}",
+                    city=rng.choice(CITIES),
+                    type=rng.choice(['public', 'private']),
+                    description=f"Établissement de {rng.choice(CITIES)}.",
+                )
+                for index in indexes
+            ])
+            ids.extend(institution.pk for institution in institutions)
+        self.counts['institutions'] = len(ids)
+        return ids
+
+    def create_fields(self, institution_ids):
+        self.log(f"Creating {self.field_count} fields...")
+        Link = Field.institutions.through
+        ids = []
+        for batch, indexes in self.batches(self.field_count):
+            rng = self.rng('fields', batch)
+            fields = []
+            for index in indexes:
+                subjects = rng.sample(SUBJECTS, 3)
+                fields.append(Field(
+                    name=f"{subjects[0]} et {subjects[1]} {index + 1}",
+                    description=f"Formation en {', '.join(subjects).lower()}.",
+                    duration_years=rng.choice([3, 5, 7]),
+                    career_opportunities=[f"Spécialiste en {subject.lower()}" for subject in subjects],
+                    required_skills=rng.sample(SKILLS, 3),
+                    tuition_fees_min=rng.choice([50000, 100000, 250000]),
+                    tuition_fees_max=rng.choice([300000, 500000, 1000000]),
+                ))
+            with transaction.atomic():
+                fields = Field.objects.bulk_create(fields)
+                # One insert for all the links of the batch instead of one .add() per field
+                Link.objects.bulk_create([
+                    Link(field_id=field.pk, institution_id=institution_id)
+                    for field in fields
+                    for institution_id in rng.sample(institution_ids, min(len(institution_ids), rng.randint(1, 3)))
+                ])
+            ids.extend(field.pk for field in fields)
+        self.counts['fields'] = len(ids)
+        return ids
+
+    def create_students(self, questions, field_ids):
+        self.log(f"Creating {self.scale} students with their tests, answers and favorites...")
+        password = make_password(SYNTHETIC_PASSWORD)
+        for batch, indexes in self.batches(self.scale):
+            rng = self.rng('students', batch)
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        username=f'{USERNAME_PREFIX}{index + 1}',
+                        email=f'{USERNAME_PREFIX}{index + 1}@example.cm',
+                        password=password,
+                        role='student',
+                    )
+                    for index in indexes
+                ])
+                StudentProfile.objects.bulk_create([StudentProfile(user_id=user.pk) for user in users])
+
+                tests = []
+                for user in users:
+                    # Most students complete one test, some retake it, some never finish
+                    for _ in range(rng.choice([1, 1, 1, 2])):
+                        completed = rng.random() < 0.85
+                        completed_at = self.now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)) if completed else None
+                        tests.append(OrientationTest(user_id=user.pk, is_completed=completed, completed_at=completed_at))
+                tests = OrientationTest.objects.bulk_create(tests)
+                TestResponse.objects.bulk_create(
+                    (
+                        TestResponse(orientation_test_id=orientation_test.pk, question_id=question.pk, answer=random_answer(question, rng))
+                        for orientation_test in tests
+                        for question in questions
+                    ),
+                    batch_size=self.batch_size,
+                )
+
+                favorites = Favorite.objects.bulk_create([
+                    Favorite(user_id=user.pk, field_id=field_id)
+                    for user in users
+                    for field_id in rng.sample(field_ids, min(len(field_ids), rng.randint(0, 5)))
+                ])
+
+            self.counts['students'] += len(users)
+            self.counts['tests'] += len(tests)
+            self.counts['responses'] += len(tests) * len(questions)
+            self.counts['favorites'] += len(favorites)
+            self.log(f"{self.counts['students']}/{self.scale} students")
@@ -0,0 +1,24 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin pinning the maximum number of SQL queries a block of code may run.
+
+    Unlike assertNumQueries, a budget only fails when it is exceeded, so endpoints can get
+    cheaper without touching their tests, and the failure message lists every query executed.
+    """
+
+    @contextmanager
+    def assertMaxQueries(self, max_queries, using=DEFAULT_DB_ALIAS):
+        with CaptureQueriesContext(connections[using]) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > max_queries:
+            queries = '\n'.join(
+                f"{index}. {query['sql']}" for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(f"{executed} queries executed, budget is {max_queries}:\n{queries}")
@@ -1,3 +1,170 @@
-from django.test import TestCase
+import marshal
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import StudentProfile, User
+from catalog.models import Favorite, Field, FieldFeatureVector, Institution
+from orientation.models import OrientationTest, Recommendation, TestResponse
+from orientation.recommendation import save_recommendation
+from .metrics import registry
+from .profiling import store
+from .stats import read_dashboard_stats, reconcile
+from .synthetic import SyntheticDataGenerator
+from .testing import QueryBudgetMixin
+
+
+class DashboardStatsTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', 'admin@enspd.cm', 'admin123', role='admin')
+        self.student = User.objects.create_user('etudiant', 'etudiant@enspd.cm', 'etudiant123', role='student')
+        Institution.objects.create(name='ENSPD', city='Douala', type='public')
+        self.fields = [
+            Field.objects.create(name=f"Filière {index}", description='Description', duration_years=5)
+            for index in range(3)
+        ]
+
+    def test_counters_follow_writes_and_match_reconcile(self):
+        orientation_test = OrientationTest.objects.create(user=self.student)
+        orientation_test.is_completed = True
+        orientation_test.save()
+        OrientationTest.objects.create(user=self.student)
+        save_recommendation(orientation_test, [(self.fields[0].pk, 0.9), (self.fields[1].pk, 0.8)])
+        save_recommendation(orientation_test, [(self.fields[1].pk, 0.9), (self.fields[2].pk, 0.8)])
+        Favorite.objects.create(user=self.student, field=self.fields[2])
+        self.student.role = 'advisor'
+        self.student.save()
+        self.fields[0].delete()
+
+        incremental = read_dashboard_stats()
+        self.assertEqual(incremental['total_users'], 2)
+        self.assertEqual(incremental['users_by_role'], [{'role': 'admin', 'count': 1}, {'role': 'advisor', 'count': 1}])
+        self.assertEqual(incremental['tests_started'], 2)
+        self.assertEqual(incremental['total_tests_completed'], 1)
+        self.assertEqual(incremental['total_academic_fields'], 2)
+        self.assertEqual(incremental['top_recommended_fields'][0]['count'], 1)
+        self.assertEqual(incremental['top_favorited_fields'], [{'id': self.fields[2].pk, 'name': 'Filière 2', 'count': 1}])
+
+        reconcile()
+        self.assertEqual(read_dashboard_stats(), incremental)
+
+    def test_dashboard_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertMaxQueries(3):
+            response = client.get(reverse('admin-dashboard-stats'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_institutions'], 1)
+
+
+class SyntheticDataTests(TestCase):
+
+    def test_seed_data_scale(self):
+        call_command('seed_data', '--scale=30', '--batch-size=7', stdout=StringIO())
+        students = User.objects.filter(username__startswith='synth_')
+        self.assertEqual(students.count(), 30)
+        self.assertEqual(StudentProfile.objects.filter(user__in=students).count(), 30)
+        self.assertTrue(all(field.institutions.exists() for field in Field.objects.filter(name__regex=r' \d+$')))
+
+        # Derived data is rebuilt after the bulk inserts
+        self.assertEqual(FieldFeatureVector.objects.count(), Field.objects.count())
+        self.assertEqual(
+            Recommendation.objects.count(), OrientationTest.objects.filter(is_completed=True).count()
+        )
+        self.assertEqual(read_dashboard_stats()['total_users'], User.objects.count())
+
+        with self.assertRaises(CommandError):
+            call_command('seed_data', '--scale=30', stdout=StringIO())
+
+    def test_generation_is_deterministic(self):
+        def snapshot():
+            return (
+                list(OrientationTest.objects.order_by('id').values_list('user__username', 'is_completed')),
+                list(TestResponse.objects.order_by('id').values_list('question__text', 'answer')),
+                list(Favorite.objects.order_by('id').values_list('user__username', 'field__name')),
+            )
+
+        SyntheticDataGenerator(20, seed=7, batch_size=6).run()
+        first = snapshot()
+        User.objects.filter(username__startswith='synth_').delete()
+        Field.objects.all().delete()
+        Institution.objects.all().delete()
+        SyntheticDataGenerator(20, seed=7, batch_size=6).run()
+        self.assertEqual(snapshot(), first)
+
+
+@override_settings(MIDDLEWARE=['core.middleware.RequestMetricsMiddleware', *settings.MIDDLEWARE])
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        registry.reset()
+        self.admin = User.objects.create_user('admin', 'admin@enspd.cm', 'admin123', role='admin')
+        self.client = APIClient()
+        Field.objects.create(name="Informatique", description='Description', duration_years=5)
+
+    def test_server_timing_and_metrics_endpoint(self):
+        response = self.client.get(reverse('field-list-create'))
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'sql;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('serialize;dur=', timing)
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 401)
+
+        self.client.force_authenticate(self.admin)
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('http_requests_total{view="field-list-create",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_sql_queries_count{view="field-list-create",method="GET"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{view="field-list-create",method="GET",le="+Inf"} 1', body)
+        self.assertIn('cache_requests_total{cache="catalog:field-detail",result="hits"}', body)
+
+
+@override_settings(
+    MIDDLEWARE=[*settings.MIDDLEWARE, 'core.middleware.ProfilingMiddleware'],
+    PROFILING_SAMPLE_RATE=0,
+    PROFILING_SLOW_QUERY_MS=0,
+)
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        store.clear()
+        self.admin = User.objects.create_user('admin', 'admin@enspd.cm', 'admin123', role='admin')
+        self.student = User.objects.create_user('etudiant', 'etudiant@enspd.cm', 'etudiant123', role='student')
+        Field.objects.create(name="Informatique", description='Description', duration_years=5)
+        self.client = APIClient()
+
+    def bearer(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+    def test_admin_header_profiles_request(self):
+        with self.assertLogs('core.profiling', 'WARNING') as logs:
+            response = self.client.get(reverse('field-list-create'), HTTP_X_PROFILE='1', **self.bearer(self.admin))
+        self.assertEqual(response.status_code, 200)
+        profile_id = int(response['X-Profile-Id'])
+        # Every query is over a 0 ms threshold, logged with the project code that ran it
+        self.assertTrue(any('core/pagination.py' in line for line in logs.output), logs.output)
+
+        self.client.force_authenticate(self.admin)
+        profiles = self.client.get(reverse('profile-list')).data
+        self.assertEqual([profile['id'] for profile in profiles], [profile_id])
+        self.assertEqual(profiles[0]['view'], 'field-list-create')
+        self.assertTrue(profiles[0]['slow_queries'])
+
+        response = self.client.get(reverse('profile-download', args=[profile_id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(marshal.loads(response.content))
+
+    def test_header_ignored_for_non_admins(self):
+        with self.assertLogs('core.profiling', 'WARNING'):
+            response = self.client.get(reverse('field-list-create'), HTTP_X_PROFILE='1', **self.bearer(self.student))
+            self.assertNotIn('X-Profile-Id', response)
+            response = self.client.get(reverse('field-list-create'), HTTP_X_PROFILE='1', HTTP_AUTHORIZATION='Bearer invalid')
+            self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(store.all(), [])
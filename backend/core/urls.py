@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import MetricsView, ProfileDownloadView, ProfileListView
+
+urlpatterns = [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('profiles/<int:pk>/', ProfileDownloadView.as_view(), name='profile-download'),
+]
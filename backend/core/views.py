@@ -1,3 +1,45 @@
-from django.shortcuts import render
+from django.http import Http404, HttpResponse
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from accounts.permissions import IsAdmin
+from .metrics import registry
+from .profiling import store
+
+
+class MetricsView(APIView):
+    """
+    Request metrics of this process in the Prometheus text exposition format.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+class ProfileListView(APIView):
+    """
+    The last request profiles taken by this process (see core.middleware.ProfilingMiddleware), newest first.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        return Response([
+            {**record.as_dict(), 'summary': record.summary()} for record in store.all()
+        ])
+
+
+class ProfileDownloadView(APIView):
+    """
+    Downloads a profile in the cProfile format, e.g. for `python -m pstats` or snakeviz.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsAdmin]
+
+    def get(self, request, pk):
+        record = store.get(pk)
+        if record is None:
+            raise Http404
+        response = HttpResponse(record.dump(), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="profile-{record.id}.prof"'
+        return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrientationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orientation'
+
+    def ready(self):
+        from . import signals # noqa: F401 -- registers the question bank receivers
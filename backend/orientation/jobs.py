@@ -0,0 +1,106 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+
+from .models import OrientationTest, ScoringJob, TestResponse
+from .recommendation import DEFAULT_TOP_K, compute_user_scores, get_engine, save_recommendation
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+# A job still running after this long is assumed to belong to a dead worker and is retried
+STALE_AFTER = timedelta(minutes=5)
+
+# Delay before the first retry of a failed job, doubled on every following one
+RETRY_BACKOFF = timedelta(seconds=30)
+
+
+def scoring_queryset():
+    """
+    Tests with what `score_test` reads: their answers, scored by the compiled question scorers.
+    """
+    return OrientationTest.objects.prefetch_related(
+        Prefetch('responses', queryset=TestResponse.objects.only('id', 'orientation_test_id', 'question_id', 'answer').order_by('id'))
+    )
+
+
+def score_test(orientation_test):
+    """
+    Computes and stores the category scores and recommendation of a completed test,
+    loaded from `scoring_queryset()`.
+    """
+    # Score the student per category, then match them against every field at once
+    user_scores = compute_user_scores(orientation_test.responses.all())
+    top_fields = get_engine().top_k(user_scores, k=DEFAULT_TOP_K)
+
+    with transaction.atomic():
+        orientation_test.scores_data = user_scores
+        orientation_test.save(update_fields=['is_completed', 'completed_at', 'scores_data'])
+        save_recommendation(orientation_test, top_fields)
+    return orientation_test
+
+
+def enqueue_scoring(orientation_test):
+    return ScoringJob.objects.create(orientation_test=orientation_test)
+
+
+def is_async_scoring_enabled():
+    return getattr(settings, 'ORIENTATION_ASYNC_SCORING', False)
+
+
+def claim_jobs(limit):
+    """
+    Atomically moves up to `limit` runnable jobs to 'running' and returns them.
+
+    A job is claimed with a conditional UPDATE, so concurrent workers never run the same job.
+    """
+    now = timezone.now()
+    runnable = Q(status='pending', available_at__lte=now) | Q(status='running', started_at__lt=now - STALE_AFTER)
+    claimed = []
+    for job in ScoringJob.objects.filter(runnable).order_by('available_at', 'id')[:limit]:
+        updated = ScoringJob.objects.filter(pk=job.pk, status=job.status, started_at=job.started_at).update(
+            status='running', started_at=now, attempts=job.attempts + 1
+        )
+        if updated:
+            job.status, job.started_at, job.attempts = 'running', now, job.attempts + 1
+            claimed.append(job)
+    return claimed
+
+
+def requeue_failed_jobs():
+    """
+    Moves the failed jobs of tests still without a recommendation back to 'pending', with their
+    attempts reset. Returns the number of jobs queued again.
+    """
+    return ScoringJob.objects.filter(status='failed', orientation_test__recommendation__isnull=True).update(
+        status='pending', attempts=0, error='', started_at=None, finished_at=None, available_at=timezone.now()
+    )
+
+
+def run_job(job):
+    """
+    Runs a claimed job. Failures are retried with exponential backoff until MAX_ATTEMPTS,
+    then the job stays 'failed'.
+    """
+    try:
+        score_test(scoring_queryset().get(pk=job.orientation_test_id))
+    except Exception as exc:
+        logger.exception("Scoring job %s failed (attempt %s)", job.pk, job.attempts)
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.finished_at = timezone.now()
+        if job.attempts >= MAX_ATTEMPTS:
+            job.status = 'failed'
+        else:
+            job.status = 'pending'
+            job.available_at = job.finished_at + RETRY_BACKOFF * 2 ** (job.attempts - 1)
+    else:
+        job.status = 'done'
+        job.error = ''
+        job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at', 'available_at'])
+    return job
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:41
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def remove_duplicate_responses(apps, schema_editor):
+    # Keep the latest answer when a question was answered more than once
+    TestResponse = apps.get_model('orientation', 'TestResponse')
+    latest_ids = TestResponse.objects.values('orientation_test', 'question').annotate(latest_id=Max('id')).values('latest_id')
+    TestResponse.objects.exclude(id__in=latest_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orientation', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_responses, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='testresponse',
+            unique_together={('orientation_test', 'question')},
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_items(apps, schema_editor):
+    Field = apps.get_model('catalog', 'Field')
+    Recommendation = apps.get_model('orientation', 'Recommendation')
+    RecommendationItem = apps.get_model('orientation', 'RecommendationItem')
+
+    field_ids = set(Field.objects.values_list('id', flat=True))
+    items = []
+    rows = Recommendation.objects.values_list('id', 'recommended_fields', 'compatibility_scores')
+    for recommendation_id, recommended_fields, compatibility_scores in rows.iterator(chunk_size=BATCH_SIZE):
+        scores = compatibility_scores if isinstance(compatibility_scores, dict) else {}
+        ranked_ids = [field_id for field_id in recommended_fields or [] if field_id in field_ids]
+        for rank, field_id in enumerate(ranked_ids, start=1):
+            items.append(RecommendationItem(
+                recommendation_id=recommendation_id,
+                field_id=field_id,
+                rank=rank,
+                score=float(scores.get(str(field_id), 0) or 0),
+            ))
+        if len(items) >= BATCH_SIZE:
+            RecommendationItem.objects.bulk_create(items)
+            items = []
+    RecommendationItem.objects.bulk_create(items)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_pagination_indexes'),
+        ('orientation', '0002_unique_test_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_items', to='catalog.field')),
+                ('recommendation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='orientation.recommendation')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'recommendation'], name='orientation_item_field_idx'), models.Index(fields=['field', '-score'], name='orientation_item_score_idx')],
+                'unique_together': {('recommendation', 'rank')},
+            },
+        ),
+        migrations.RunPython(backfill_items, migrations.RunPython.noop),
+    ]
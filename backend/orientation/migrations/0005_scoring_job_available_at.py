@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orientation', '0004_scoring_jobs'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='scoringjob',
+            name='orientation_job_queue_idx',
+        ),
+        migrations.AddField(
+            model_name='scoringjob',
+            name='available_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='scoringjob',
+            index=models.Index(fields=['status', 'available_at'], name='orientation_job_available_idx'),
+        ),
+    ]
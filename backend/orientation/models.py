@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import User # Import the custom User model
 from catalog.models import Field # Import Field model for recommendations
 
@@ -38,6 +39,9 @@ class TestResponse(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     answer = models.JSONField() # Can be a string, list, or dict based on question type
 
+    class Meta:
+        unique_together = ('orientation_test', 'question') # One answer per question, upserted on resubmission
+
     def __str__(self):
         return f"Response for {self.orientation_test.user.username} - {self.question.text[:30]}"
 
@@ -49,4 +53,52 @@ class Recommendation(models.Model):
     generated_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Recommendation for {self.orientation_test.user.username}"
\ No newline at end of file
+        return f"Recommendation for {self.orientation_test.user.username}"
+
+class RecommendationItem(models.Model):
+    """
+    One recommended field of a Recommendation, normalized from `recommended_fields` and
+    `compatibility_scores` so per-field analytics are indexed lookups.
+    """
+    recommendation = models.ForeignKey(Recommendation, on_delete=models.CASCADE, related_name='items')
+    field = models.ForeignKey(Field, on_delete=models.CASCADE, related_name='recommendation_items')
+    rank = models.PositiveSmallIntegerField() # 1 for the best match
+    score = models.FloatField() # Compatibility percentage
+
+    class Meta:
+        unique_together = ('recommendation', 'rank')
+        indexes = [
+            models.Index(fields=['field', 'recommendation'], name='orientation_item_field_idx'),
+            models.Index(fields=['field', '-score'], name='orientation_item_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.rank} {self.field_id} ({self.score}%)"
+
+
+class ScoringJob(models.Model):
+    """
+    Queued computation of a test's scores and recommendation, run by `manage.py run_scoring_worker`.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    orientation_test = models.ForeignKey(OrientationTest, on_delete=models.CASCADE, related_name='scoring_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    available_at = models.DateTimeField(default=timezone.now) # A pending job is not run before, retries are delayed
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='orientation_job_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"Scoring of test {self.orientation_test_id} ({self.status})"
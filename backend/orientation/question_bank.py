@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from core.cache import bump_version, get_version
+from .models import Question
+
+# Cache namespace of the question bank, bumped on every Question write
+QUESTION_BANK_NAMESPACE = 'orientation:questions'
+
+# Read-only snapshot of a Question, safe to share between requests
+QuestionMeta = namedtuple('QuestionMeta', ['id', 'category', 'question_type', 'options'])
+
+
+def get_question_bank_version():
+    """
+    Version of the question bank, bumped by orientation/signals.py on every Question write.
+
+    It expires after QUESTION_BANK_MAX_AGE seconds: with a per-process cache (locmem) the other
+    processes do not see the bump, and reload the questions when their version expires.
+    """
+    return get_version(QUESTION_BANK_NAMESPACE, timeout=settings.QUESTION_BANK_MAX_AGE)
+
+
+def bump_question_bank_version():
+    return bump_version(QUESTION_BANK_NAMESPACE, timeout=settings.QUESTION_BANK_MAX_AGE)
+
+
+_questions = None
+_questions_version = None
+_questions_lock = threading.Lock()
+
+
+def _load_questions():
+    rows = Question.objects.values_list('id', 'category', 'question_type', 'options')
+    return {row[0]: QuestionMeta(*row) for row in rows}
+
+
+def get_question_map():
+    """
+    Returns {question id: QuestionMeta} for the whole question bank.
+
+    The snapshot is loaded once per process and reloaded when the question bank version changes or expires.
+    """
+    global _questions, _questions_version
+    version = get_question_bank_version()
+    with _questions_lock:
+        if _questions is None or _questions_version != version:
+            _questions = _load_questions()
+            _questions_version = version
+        return _questions
+
+
+# Minimum seconds between two reloads forced by unknown question ids, which come from requests
+UNKNOWN_ID_RELOAD_INTERVAL = 10
+
+_last_forced_reload = None
+
+
+def get_questions(question_ids):
+    """
+    Returns the QuestionMeta of the given ids that exist.
+
+    An unknown id may have been created by another process, so it triggers a reload, at most
+    once every UNKNOWN_ID_RELOAD_INTERVAL seconds: ids are client input, and bogus ones must not
+    reload the bank and recompile its scorers on every request.
+    """
+    global _last_forced_reload
+    questions = get_question_map()
+    if any(question_id not in questions for question_id in question_ids):
+        now = time.monotonic()
+        with _questions_lock:
+            reload = _last_forced_reload is None or now - _last_forced_reload >= UNKNOWN_ID_RELOAD_INTERVAL
+            if reload:
+                _last_forced_reload = now
+        if reload:
+            invalidate_question_map()
+            questions = get_question_map()
+    return {question_id: questions[question_id] for question_id in question_ids if question_id in questions}
+
+
+def invalidate_question_map(*args, **kwargs):
+    """
+    Drops the cached question bank. Usable as a signal receiver.
+    """
+    global _questions
+    with _questions_lock:
+        _questions = None
+
+
+class CompiledQuestions:
+    """
+    Per-process {question id: compile(QuestionMeta)} derived from the question bank snapshot,
+    recompiled whenever the snapshot is reloaded. Questions compiled to None are left out.
+    """
+
+    def __init__(self, compile):
+        self.compile = compile
+        self._source = None
+        self._compiled = None
+        self._lock = threading.Lock()
+
+    def get(self, question_ids=None):
+        """
+        Returns the compiled question bank, reloaded like `get_questions` (at most once every
+        UNKNOWN_ID_RELOAD_INTERVAL seconds) if one of `question_ids` is unknown.
+        """
+        if question_ids is not None:
+            get_questions(question_ids)
+        questions = get_question_map()
+        with self._lock:
+            if self._source is not questions:
+                compiled = ((question_id, self.compile(question)) for question_id, question in questions.items())
+                self._compiled = {question_id: value for question_id, value in compiled if value is not None}
+                self._source = questions
+            return self._compiled
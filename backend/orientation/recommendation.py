@@ -0,0 +1,236 @@
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+
+from catalog.features import FEATURE_DIMENSIONS
+from catalog.models import FieldFeatureVector
+from .models import Recommendation, RecommendationItem
+from .scoring import get_scorers
+
+# Scoring dimensions, in the column order of the field-feature matrix
+CATEGORIES = FEATURE_DIMENSIONS
+
+# Weight of each dimension in the final compatibility score
+CATEGORY_WEIGHTS = np.array([0.4, 0.3, 0.0, 0.0])
+
+# A category only contributes once the student's normalized score exceeds this value
+ACTIVATION_THRESHOLD = 0.5
+
+DEFAULT_TOP_K = 5
+
+RECOMMENDATION_JUSTIFICATION = "Cette recommandation est basée sur l'analyse de vos intérêts académiques et compétences perçues. Les filières proposées correspondent le mieux à votre profil."
+NO_RECOMMENDATION_JUSTIFICATION = "Nous n'avons pas pu trouver de recommandations précises pour vous. Veuillez réessayer le test ou contacter un conseiller."
+
+
+def compute_user_scores(responses, scorers=None):
+    """
+    Computes the normalized (0..1) score of a student per category from their test responses.
+
+    Each answer goes through the compiled scorer of its question (see orientation.scoring),
+    `scorers` defaults to the ones of the current question bank.
+    """
+    if scorers is None:
+        scorers = get_scorers()
+    user_scores = {category: 0 for category in CATEGORIES}
+
+    for response in responses:
+        scorer = scorers.get(response.question_id)
+        if scorer is not None and scorer.category in user_scores:
+            user_scores[scorer.category] += scorer.score(response.answer)
+
+    # Assuming a max score of 5 per category for now
+    for category in user_scores:
+        user_scores[category] = min(1, user_scores[category] / 5)
+    return user_scores
+
+
+class RecommendationEngine:
+    """
+    Scores a student against every field at once.
+
+    The engine holds a (fields x categories) feature matrix built once from the field index,
+    so a recommendation is a single matrix-vector product followed by a partial top-k selection.
+    """
+
+    def __init__(self, field_ids, matrix):
+        self.field_ids = np.asarray(field_ids, dtype=np.int64)
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(len(self.field_ids), len(CATEGORIES))
+
+    @classmethod
+    def from_index(cls):
+        """
+        Builds the engine from the precomputed catalog.FieldFeatureVector rows.
+        """
+        rows = FieldFeatureVector.objects.order_by('field_id').values_list('field_id', 'vector')
+        field_ids = []
+        vectors = []
+        for field_id, vector in rows:
+            field_ids.append(field_id)
+            vectors.append(vector)
+        return cls(field_ids, vectors)
+
+    def __len__(self):
+        return len(self.field_ids)
+
+    def user_vector(self, user_scores):
+        scores = np.array([user_scores.get(category, 0) for category in CATEGORIES], dtype=np.float64)
+        scores[scores <= ACTIVATION_THRESHOLD] = 0.0
+        return scores * CATEGORY_WEIGHTS
+
+    def score(self, user_scores):
+        """
+        Returns the compatibility (0..1) of every field, aligned with `field_ids`.
+        """
+        return np.minimum(self.matrix @ self.user_vector(user_scores), 1.0)
+
+    def top_k(self, user_scores, k=DEFAULT_TOP_K):
+        """
+        Returns the `k` most compatible fields as a list of (field_id, score), best first.
+
+        Ties are broken by catalog order (lowest field id first), like a stable sort would.
+        """
+        if not len(self) or k <= 0:
+            return []
+        scores = self.score(user_scores)
+        k = min(k, len(scores))
+
+        # k-th best score in O(n), then keep everything above it plus the first ties
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        selected = np.concatenate((above, ties))
+        selected = selected[np.lexsort((selected, -scores[selected]))]
+
+        return [(int(self.field_ids[i]), float(scores[i])) for i in selected]
+
+    def top_k_many(self, user_scores_list, k=DEFAULT_TOP_K):
+        """
+        Batched `top_k`: scores every student of `user_scores_list` against every field in one
+        matrix product and returns one list of (field_id, score) per student, with the same ties.
+        """
+        if not len(self) or k <= 0:
+            return [[] for _ in user_scores_list]
+        users = np.array([self.user_vector(user_scores) for user_scores in user_scores_list]).reshape(-1, len(CATEGORIES))
+        scores = np.minimum(users @ self.matrix.T, 1.0)
+        count = scores.shape[1]
+        k = min(k, count)
+
+        # Same selection as `top_k`, row-wise: everything above the k-th best score plus the first ties
+        threshold = np.partition(scores, count - k, axis=1)[:, count - k, None]
+        above = scores > threshold
+        ties = scores == threshold
+        keep = above | (ties & (np.cumsum(ties, axis=1) <= k - above.sum(axis=1, keepdims=True)))
+        selected = np.nonzero(keep)[1].reshape(len(users), k)
+
+        # Best first, a stable sort keeps equal scores in field id order
+        rows = np.arange(len(users))[:, None]
+        selected = np.take_along_axis(selected, np.argsort(-scores[rows, selected], axis=1, kind='stable'), axis=1)
+        return [
+            [(int(field_id), float(score)) for field_id, score in zip(field_ids, row_scores)]
+            for field_ids, row_scores in zip(self.field_ids[selected], scores[rows, selected])
+        ]
+
+
+_engine = None
+_engine_fingerprint = None
+_engine_lock = threading.Lock()
+
+
+def index_fingerprint():
+    """
+    Cheap summary of the field index, changes whenever a row is written or deleted.
+    """
+    summary = FieldFeatureVector.objects.aggregate(count=Count('pk'), updated_at=Max('updated_at'))
+    return summary['count'], summary['updated_at']
+
+
+def get_engine():
+    """
+    Returns the process-wide engine, rebuilding the feature matrix when the field index changed.
+    """
+    global _engine, _engine_fingerprint
+    fingerprint = index_fingerprint()
+    with _engine_lock:
+        if _engine is None or _engine_fingerprint != fingerprint:
+            _engine = RecommendationEngine.from_index()
+            _engine_fingerprint = fingerprint
+        return _engine
+
+
+def _recommendation_data(top_fields):
+    recommended_fields_ids = [field_id for field_id, score in top_fields]
+    compatibility_scores = {str(field_id): round(score * 100, 2) for field_id, score in top_fields} # Convert to percentage
+    return recommended_fields_ids, compatibility_scores
+
+
+def save_recommendation(orientation_test, top_fields):
+    """
+    Stores the (field_id, score) pairs of `top_fields`, best first, as the test's Recommendation
+    and its normalized RecommendationItem rows.
+    """
+    recommended_fields_ids, compatibility_scores = _recommendation_data(top_fields)
+
+    with transaction.atomic():
+        recommendation = Recommendation.objects.select_for_update().filter(orientation_test=orientation_test).first()
+        if recommendation is None:
+            recommendation = Recommendation(orientation_test=orientation_test)
+        else:
+            recommendation.items.all().delete()
+            orientation_test.recommendation = recommendation
+        recommendation.recommended_fields = recommended_fields_ids
+        recommendation.compatibility_scores = compatibility_scores
+        recommendation.justification = RECOMMENDATION_JUSTIFICATION if recommended_fields_ids else NO_RECOMMENDATION_JUSTIFICATION
+        recommendation.save()
+
+        RecommendationItem.objects.bulk_create(
+            RecommendationItem(
+                recommendation=recommendation,
+                field_id=field_id,
+                rank=rank,
+                score=compatibility_scores[str(field_id)],
+            )
+            for rank, field_id in enumerate(recommended_fields_ids, start=1)
+        )
+    return recommendation
+
+
+def save_recommendations_bulk(results):
+    """
+    Stores the recommendations of many tests at once from {orientation test id: top_fields}.
+
+    Existing rows are rewritten with bulk_update, so no model signal runs: derived counters
+    must be reconciled afterwards (`manage.py reconcile_stats`).
+    """
+    with transaction.atomic():
+        existing = {
+            recommendation.orientation_test_id: recommendation
+            for recommendation in Recommendation.objects.select_for_update().filter(orientation_test_id__in=list(results))
+        }
+        RecommendationItem.objects.filter(recommendation__in=list(existing.values())).delete()
+
+        created = []
+        for test_id, top_fields in results.items():
+            recommendation = existing.get(test_id)
+            if recommendation is None:
+                recommendation = Recommendation(orientation_test_id=test_id)
+                created.append(recommendation)
+            recommendation.recommended_fields, recommendation.compatibility_scores = _recommendation_data(top_fields)
+            recommendation.justification = RECOMMENDATION_JUSTIFICATION if top_fields else NO_RECOMMENDATION_JUSTIFICATION
+
+        Recommendation.objects.bulk_update(
+            existing.values(), ['recommended_fields', 'compatibility_scores', 'justification']
+        )
+        Recommendation.objects.bulk_create(created)
+
+        RecommendationItem.objects.bulk_create(
+            RecommendationItem(
+                recommendation=recommendation,
+                field_id=field_id,
+                rank=rank,
+                score=recommendation.compatibility_scores[str(field_id)],
+            )
+            for recommendation in (*existing.values(), *created)
+            for rank, field_id in enumerate(recommendation.recommended_fields, start=1)
+        )
@@ -0,0 +1,106 @@
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.db import transaction
+
+from .models import OrientationTest, TestResponse
+from .recommendation import DEFAULT_TOP_K, RecommendationEngine, compute_user_scores, save_recommendations_bulk
+from .scoring import get_scorers
+
+# Picklable stand-in for a TestResponse, what `compute_user_scores` reads
+ResponseRow = namedtuple('ResponseRow', ['question_id', 'answer'])
+
+# Engine and question scorers of a worker process, set once by `_init_worker` instead of being
+# pickled with every batch
+_worker_engine = None
+_worker_scorers = None
+
+
+def _init_worker(field_ids, matrix, scorers):
+    global _worker_engine, _worker_scorers
+    _worker_engine = RecommendationEngine(field_ids, matrix)
+    _worker_scorers = scorers
+
+
+def score_batch(batch, engine=None, scorers=None):
+    """
+    Scores a batch of (test id, [ResponseRow]) and returns [(test id, user scores, top_fields)].
+
+    Pure computation, runs in worker processes without touching the database.
+    """
+    if engine is None:
+        engine, scorers = _worker_engine, _worker_scorers
+    user_scores_list = [compute_user_scores(responses, scorers) for test_id, responses in batch]
+    top_fields_list = engine.top_k_many(user_scores_list, k=DEFAULT_TOP_K)
+    return [
+        (test_id, user_scores, top_fields)
+        for (test_id, responses), user_scores, top_fields in zip(batch, user_scores_list, top_fields_list)
+    ]
+
+
+def iter_batches(batch_size, start_after=0):
+    """
+    Streams the completed tests after `start_after`, by id, as batches of (test id, [ResponseRow]).
+    """
+    test_ids = (
+        OrientationTest.objects.filter(is_completed=True, pk__gt=start_after)
+        .order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+    )
+    while True:
+        ids = list(islice(test_ids, batch_size))
+        if not ids:
+            return
+        responses = defaultdict(list)
+        rows = TestResponse.objects.filter(orientation_test_id__in=ids).order_by('id')
+        for test_id, question_id, answer in rows.values_list('orientation_test_id', 'question_id', 'answer'):
+            responses[test_id].append(ResponseRow(question_id, answer))
+        yield [(test_id, responses[test_id]) for test_id in ids]
+
+
+def write_batch(results):
+    """
+    Stores the scores and recommendations of a scored batch in one transaction.
+    """
+    tests = [OrientationTest(pk=test_id, scores_data=user_scores) for test_id, user_scores, top_fields in results]
+    with transaction.atomic():
+        OrientationTest.objects.bulk_update(tests, ['scores_data'])
+        save_recommendations_bulk({test_id: top_fields for test_id, user_scores, top_fields in results})
+
+
+def rescore_tests(batch_size=1000, workers=1, start_after=0, on_batch=None):
+    """
+    Recomputes the scores and recommendation of every completed test after `start_after`.
+
+    Batches are scored by `workers` processes (inline for 1) and written in test id order,
+    then `on_batch(last test id, tests in batch)` is called, e.g. to save a checkpoint.
+    Returns the number of rescored tests.
+    """
+    engine = RecommendationEngine.from_index()
+    scorers = get_scorers()
+    batches = iter_batches(batch_size, start_after)
+    rescored = 0
+
+    def written(results):
+        nonlocal rescored
+        write_batch(results)
+        rescored += len(results)
+        if on_batch:
+            on_batch(results[-1][0], len(results))
+
+    if workers <= 1:
+        for batch in batches:
+            written(score_batch(batch, engine, scorers))
+        return rescored
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine.field_ids, engine.matrix, scorers)) as pool:
+        # Bounded window of batches in flight: reading stays ahead of the workers without
+        # buffering the whole table, and results are written back in order
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(score_batch, batch))
+            if len(pending) >= workers * 2:
+                written(pending.popleft().result())
+        while pending:
+            written(pending.popleft().result())
+    return rescored
@@ -0,0 +1,118 @@
+from .question_bank import CompiledQuestions
+
+# Points given to a choice whose label mentions one of these keywords, per question category
+OPTION_KEYWORD_WEIGHTS = {
+    'academic_interests': {'science': 2},
+    'perceived_skills': {'math': 2},
+}
+
+# Scorer class per Question.question_type, see `register_scorer`
+SCORERS = {}
+
+
+def register_scorer(question_type):
+    """
+    Class decorator making a scorer the one compiled for questions of `question_type`.
+    """
+    def decorator(scorer_class):
+        SCORERS[question_type] = scorer_class
+        return scorer_class
+    return decorator
+
+
+def option_label(option):
+    return str(option['label'] if isinstance(option, dict) else option)
+
+
+def option_weight(option, category):
+    """
+    Weight of a choice: explicit with {"label": ..., "weight": ...} options, else derived from its label.
+    """
+    if isinstance(option, dict) and 'weight' in option:
+        return float(option['weight'])
+    label = option_label(option).lower()
+    return float(sum(
+        weight for keyword, weight in OPTION_KEYWORD_WEIGHTS.get(category, {}).items() if keyword in label
+    ))
+
+
+class Scorer:
+    """
+    A question compiled once into lookup tables. `score(answer)` returns the points the answer
+    adds to the question's category.
+    """
+
+    def __init__(self, question):
+        self.question_id = question.id
+        self.category = question.category
+
+    def score(self, answer):
+        return 0.0
+
+
+@register_scorer('likert')
+class LikertScorer(Scorer):
+    def score(self, answer):
+        if isinstance(answer, bool) or not isinstance(answer, (int, float)):
+            return 0.0
+        return float(answer)
+
+
+@register_scorer('mcq')
+class ChoiceScorer(Scorer):
+    def __init__(self, question):
+        super().__init__(question)
+        options = question.options or []
+        self.weights = {option_label(option): option_weight(option, question.category) for option in options}
+        # Answers are stored as submitted, also accept a label differing by case or surrounding spaces
+        self.folded_weights = {label.strip().casefold(): weight for label, weight in self.weights.items()}
+
+    def score(self, answer):
+        if not isinstance(answer, str):
+            return 0.0
+        weight = self.weights.get(answer)
+        if weight is None:
+            weight = self.folded_weights.get(answer.strip().casefold(), 0.0)
+        return weight
+
+
+@register_scorer('ranking')
+class RankingScorer(ChoiceScorer):
+    """
+    The answer orders the options by preference: each option counts its weight scaled down by
+    its position, the first choice in full and the last one for 1/n. A single option, as the
+    test page submits, is the first choice alone.
+    """
+
+    def __init__(self, question):
+        super().__init__(question)
+        count = len(self.weights)
+        self.position_factors = [(count - position) / count for position in range(count)]
+
+    def score(self, answer):
+        if isinstance(answer, str):
+            return ChoiceScorer.score(self, answer)
+        if not isinstance(answer, list):
+            return 0.0
+        return sum(
+            ChoiceScorer.score(self, choice) * factor
+            for choice, factor in zip(answer, self.position_factors)
+        )
+
+
+def compile_question(question):
+    """
+    Returns the scorer of a Question or QuestionMeta, None for a type without a registered scorer.
+    """
+    scorer_class = SCORERS.get(question.question_type)
+    return scorer_class(question) if scorer_class else None
+
+
+_scorers = CompiledQuestions(compile_question)
+
+
+def get_scorers():
+    """
+    Returns {question id: scorer} for the whole question bank, compiled once per question bank version.
+    """
+    return _scorers.get()
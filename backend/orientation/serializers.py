@@ -1,19 +1,59 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Question, OrientationTest, TestResponse, Recommendation
+from .models import Question, OrientationTest, TestResponse, Recommendation, ScoringJob
+from .scoring import option_label
+from .validation import get_answer_schemas
 from accounts.serializers import UserSerializer # For nested user representation
+from core.serializers import SparseFieldsetMixin
 from catalog.serializers import FieldSerializer # For nested field representation
 
-class QuestionSerializer(serializers.ModelSerializer):
+class QuestionAdminSerializer(serializers.ModelSerializer):
+    """
+    Question as stored, options with their optional scoring weights ({"label": ..., "weight": ...}).
+    """
     class Meta:
         model = Question
         fields = '__all__'
 
+class QuestionSerializer(QuestionAdminSerializer):
+    """
+    Question as shown on the test page: options reduced to their labels, the answers expected.
+    """
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if data.get('options') and instance.question_type != 'likert':
+            data['options'] = [option_label(option) for option in data['options']]
+        return data
+
 class TestResponseSerializer(serializers.ModelSerializer):
     class Meta:
         model = TestResponse
         fields = '__all__'
         read_only_fields = ['orientation_test'] # OrientationTest will be set by the view
 
+class BatchAnswerSerializer(serializers.Serializer):
+    question_id = serializers.IntegerField()
+    answer = serializers.JSONField()
+
+class TestResponseBatchSerializer(serializers.Serializer):
+    responses = BatchAnswerSerializer(many=True, allow_empty=False, max_length=200)
+
+    def validate_responses(self, value):
+        question_ids = [item['question_id'] for item in value]
+        if len(set(question_ids)) != len(question_ids):
+            raise serializers.ValidationError("Each question can only be answered once per batch.")
+
+        # Checked against the cached question bank, no query per answer
+        schemas = get_answer_schemas(question_ids)
+        unknown_ids = [question_id for question_id in question_ids if question_id not in schemas]
+        if unknown_ids:
+            raise serializers.ValidationError(f"Unknown question ids: {unknown_ids}")
+
+        errors = [schemas[item['question_id']].error(item['answer']) for item in value]
+        if any(errors):
+            raise serializers.ValidationError([{'answer': [error]} if error else {} for error in errors])
+        return value
+
 class RecommendationSerializer(serializers.ModelSerializer):
     # If recommended_fields stores IDs, you might want to serialize the actual Field objects
     # recommended_fields = FieldSerializer(many=True, read_only=True)
@@ -22,7 +62,14 @@ class RecommendationSerializer(serializers.ModelSerializer):
         model = Recommendation
         fields = '__all__'
 
-class OrientationTestSerializer(serializers.ModelSerializer):
+class ScoringJobSerializer(serializers.ModelSerializer):
+    status_url = serializers.HyperlinkedIdentityField(view_name='scoring-job-detail')
+
+    class Meta:
+        model = ScoringJob
+        fields = ['id', 'orientation_test', 'status', 'attempts', 'created_at', 'started_at', 'finished_at', 'status_url']
+
+class OrientationTestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True) # Display user details
     responses = TestResponseSerializer(many=True, read_only=True) # Nested responses
     recommendation = RecommendationSerializer(read_only=True) # Nested recommendation
@@ -30,3 +77,21 @@ class OrientationTestSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrientationTest
         fields = '__all__'
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        """
+        Loads everything this serializer renders in at most two queries, whatever the number of tests.
+        Relations left out with ?fields= are not loaded at all.
+        """
+        related = [name for name in ('user', 'recommendation') if cls.wants_field(request, name)]
+        if related:
+            queryset = queryset.select_related(*related)
+        if cls.wants_field(request, 'responses'):
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    'responses',
+                    queryset=TestResponse.objects.only('id', 'orientation_test_id', 'question_id', 'answer').order_by('id'),
+                )
+            )
+        return queryset
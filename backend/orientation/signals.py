@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Question
+from .question_bank import bump_question_bank_version, invalidate_question_map
+
+
+@receiver(post_save, sender=Question, dispatch_uid='orientation_question_saved')
+@receiver(post_delete, sender=Question, dispatch_uid='orientation_question_deleted')
+def question_bank_changed(sender, **kwargs):
+    bump_question_bank_version()
+    invalidate_question_map()
@@ -1,3 +1,423 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from catalog.models import Field
+from core.testing import QueryBudgetMixin
+from .jobs import MAX_ATTEMPTS, RETRY_BACKOFF, claim_jobs, requeue_failed_jobs, run_job
+from .question_bank import get_question_map, get_questions
+from .models import Question, OrientationTest, TestResponse, Recommendation, ScoringJob
+from .recommendation import ACTIVATION_THRESHOLD, RecommendationEngine, compute_user_scores, get_engine
+from .rescoring import rescore_tests
+from .scoring import get_scorers
+from .validation import get_answer_schemas
+
+
+class OrientationQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """
+    Query counts must not grow with the number of tests or responses of a student.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('etudiant', 'etudiant@enspd.cm', 'etudiant123', role='student')
+        cls.questions = [
+            Question.objects.create(
+                text=f"Question {index}",
+                category='academic_interests' if index % 2 else 'perceived_skills',
+                question_type='likert',
+                options=[1, 2, 3, 4, 5],
+            )
+            for index in range(20)
+        ]
+        for index in range(10):
+            Field.objects.create(
+                name=f"Filière {index}",
+                description='Sciences et technologies' if index % 2 else 'Arts et lettres',
+                duration_years=5,
+                required_skills=['Mathématiques'],
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def create_tests(self, count, completed=True):
+        tests = []
+        for _ in range(count):
+            orientation_test = OrientationTest.objects.create(user=self.student, is_completed=completed)
+            TestResponse.objects.bulk_create(
+                TestResponse(orientation_test=orientation_test, question=question, answer=4)
+                for question in self.questions
+            )
+            if completed:
+                Recommendation.objects.create(
+                    orientation_test=orientation_test, recommended_fields=[], compatibility_scores={}
+                )
+            tests.append(orientation_test)
+        return tests
+
+    def test_my_tests_list(self):
+        self.create_tests(30)
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('my-tests-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(len(response.data[0]['responses']), 20)
+
+    def test_my_tests_list_sparse_fields(self):
+        self.create_tests(5)
+        with self.assertMaxQueries(1):
+            response = self.client.get(reverse('my-tests-list'), {'fields': 'id,is_completed,completed_at'})
+        self.assertEqual(set(response.data[0]), {'id', 'is_completed', 'completed_at'})
+
+    def test_result(self):
+        orientation_test = self.create_tests(1)[0]
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('test-result', args=[orientation_test.pk]))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ORIENTATION_ASYNC_SCORING=False)
+    def test_complete(self):
+        orientation_test = self.create_tests(1, completed=False)[0]
+        # Test and responses, question bank load, field index check and load, then in savepoints: test update,
+        # recommendation and items, dashboard counters of completed tests and recommended fields
+        with self.assertMaxQueries(15):
+            response = self.client.post(reverse('test-complete', args=[orientation_test.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['recommendation']['recommended_fields']), 5)
+        items = Recommendation.objects.get(orientation_test=orientation_test).items.order_by('rank')
+        self.assertEqual(list(items.values_list('field_id', flat=True)), response.data['recommendation']['recommended_fields'])
+
+    @override_settings(ORIENTATION_ASYNC_SCORING=True)
+    def test_complete_async(self):
+        orientation_test = self.create_tests(1, completed=False)[0]
+        response = self.client.post(reverse('test-complete', args=[orientation_test.pk]))
+        self.assertEqual(response.status_code, 202)
+        self.assertIsNone(response.data['recommendation'])
+        job_id = response.data['scoring_job']['id']
+
+        response = self.client.get(reverse('test-result', args=[orientation_test.pk]))
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['scoring_status'], 'pending')
+
+        jobs = claim_jobs(10)
+        self.assertEqual([job.pk for job in jobs], [job_id])
+        self.assertEqual(claim_jobs(10), []) # Claimed jobs are not handed out twice
+        self.assertEqual(run_job(jobs[0]).status, 'done')
+
+        response = self.client.get(reverse('scoring-job-detail', args=[job_id]))
+        self.assertEqual(response.data['status'], 'done')
+        response = self.client.get(reverse('test-result', args=[orientation_test.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['scoring_status'], 'ready')
+        self.assertEqual(len(response.data['recommendation']['recommended_fields']), 5)
+
+    @override_settings(ORIENTATION_ASYNC_SCORING=True)
+    def test_failed_job_is_retried_with_backoff(self):
+        orientation_test = self.create_tests(1, completed=False)[0]
+        self.client.post(reverse('test-complete', args=[orientation_test.pk]))
+        with mock.patch('orientation.jobs.score_test', side_effect=RuntimeError('boom')):
+            [job] = claim_jobs(10)
+            before = timezone.now()
+            self.assertEqual(run_job(job).status, 'pending')
+            self.assertGreaterEqual(job.available_at, before + RETRY_BACKOFF)
+            self.assertEqual(claim_jobs(10), []) # Not due yet
+
+            for attempt in range(2, MAX_ATTEMPTS + 1):
+                ScoringJob.objects.filter(pk=job.pk).update(available_at=timezone.now())
+                [job] = claim_jobs(10)
+                self.assertEqual(job.attempts, attempt)
+                run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'RuntimeError: boom'))
+
+    @override_settings(ORIENTATION_ASYNC_SCORING=True)
+    def test_failed_job_can_be_queued_again(self):
+        orientation_test = self.create_tests(1, completed=False)[0]
+        self.client.post(reverse('test-complete', args=[orientation_test.pk]))
+        ScoringJob.objects.update(status='failed', attempts=MAX_ATTEMPTS, error='RuntimeError: boom')
+        self.assertEqual(self.client.get(reverse('test-result', args=[orientation_test.pk])).data['scoring_status'], 'failed')
+
+        self.assertEqual(requeue_failed_jobs(), 1)
+        [job] = claim_jobs(10)
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(run_job(job).status, 'done')
+        self.assertEqual(self.client.get(reverse('test-result', args=[orientation_test.pk])).data['scoring_status'], 'ready')
+        self.assertEqual(requeue_failed_jobs(), 0)
+
+    def test_responses_list(self):
+        orientation_test = self.create_tests(1)[0]
+        with self.assertMaxQueries(2):
+            response = self.client.get(reverse('test-responses-list', args=[orientation_test.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 20)
+
+    def test_submit_responses_batch(self):
+        orientation_test = self.create_tests(1, completed=False)[0]
+        payload = {'responses': [{'question_id': question.pk, 'answer': 2} for question in self.questions]}
+        # Test lookup, question bank load, upsert with savepoints
+        with self.assertMaxQueries(5):
+            response = self.client.post(reverse('test-submit-responses', args=[orientation_test.pk]), payload, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['saved'], 20)
+        self.assertEqual(orientation_test.responses.count(), 20)
+        self.assertTrue(all(answer == 2 for answer in orientation_test.responses.values_list('answer', flat=True)))
+
+        payload['responses'].append({'question_id': 0, 'answer': 1})
+        response = self.client.post(reverse('test-submit-responses', args=[orientation_test.pk]), payload, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class QuestionBankCacheTests(QueryBudgetMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Question.objects.create(text="Question", category='perceived_skills', question_type='likert', options=[1, 2, 3, 4, 5])
+
+    def test_etag_and_invalidation(self):
+        client = APIClient()
+        first = client.get(reverse('question-list'))
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('max-age=', first['Cache-Control'])
+
+        with self.assertMaxQueries(0):
+            cached = client.get(reverse('question-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+        Question.objects.create(text="Nouvelle question", category='academic_interests', question_type='mcq', options=['A', 'B'])
+        updated = client.get(reverse('question-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(updated.status_code, 200)
+        self.assertNotEqual(updated['ETag'], first['ETag'])
+        self.assertEqual(len(updated.json()), 2)
+
+    def test_edit_unseen_by_this_process_expires(self):
+        client = APIClient()
+        first = client.get(reverse('question-list'))
+        questions = get_question_map()
+        # A write by another process with a per-process cache: this one is not told
+        Question.objects.update(text="Question modifiée")
+        self.assertEqual(client.get(reverse('question-list'))['ETag'], first['ETag'])
+
+        later = time.time() + settings.QUESTION_BANK_MAX_AGE + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            expired = client.get(reverse('question-list'))
+            self.assertNotEqual(expired['ETag'], first['ETag'])
+            self.assertEqual(expired.json()[0]['text'], "Question modifiée")
+            self.assertIsNot(get_question_map(), questions)
+
+
+class RescoringTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('etudiant', 'etudiant@enspd.cm', 'etudiant123', role='student')
+        questions = [
+            Question.objects.create(text=f"Question {index}", category=category, question_type='likert', options=[1, 2, 3, 4, 5])
+            for index, category in enumerate(['academic_interests', 'perceived_skills'])
+        ]
+        for index in range(12):
+            Field.objects.create(
+                name=f"Filière {index}",
+                description=['Sciences et technologies', 'Mathématiques appliquées', 'Arts et lettres'][index % 3],
+                duration_years=5,
+            )
+        cls.tests = []
+        for index in range(7):
+            orientation_test = OrientationTest.objects.create(user=cls.student, is_completed=True)
+            TestResponse.objects.bulk_create(
+                TestResponse(orientation_test=orientation_test, question=question, answer=(index + offset) % 5 + 1)
+                for offset, question in enumerate(questions)
+            )
+            cls.tests.append(orientation_test)
+        cls.tests[0].recommendation = Recommendation.objects.create(
+            orientation_test=cls.tests[0], recommended_fields=[], compatibility_scores={}
+        )
+
+    def test_top_k_many_matches_top_k(self):
+        engine = get_engine()
+        profiles = [compute_user_scores(orientation_test.responses.all()) for orientation_test in self.tests]
+        self.assertEqual(engine.top_k_many(profiles), [engine.top_k(profile) for profile in profiles])
+
+    def test_rescore_tests(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, 'rescore.json')
+            checkpoints = []
+            rescored = rescore_tests(batch_size=3, on_batch=lambda last_test_id, count: checkpoints.append(last_test_id))
+            self.assertEqual(rescored, 7)
+            self.assertEqual(checkpoints, [self.tests[2].pk, self.tests[5].pk, self.tests[6].pk])
+
+            # Resuming from a checkpoint only rescores the remaining tests
+            with open(checkpoint, 'w') as f:
+                json.dump({'last_test_id': self.tests[4].pk}, f)
+            out = StringIO()
+            call_command('rescore_tests', '--workers=1', '--batch-size=2', f'--checkpoint={checkpoint}', stdout=out)
+            self.assertIn('Rescored 2 tests', out.getvalue())
+            self.assertFalse(os.path.exists(checkpoint))
+
+        engine = get_engine()
+        for orientation_test in self.tests:
+            recommendation = Recommendation.objects.get(orientation_test=orientation_test)
+            expected = engine.top_k(compute_user_scores(orientation_test.responses.all()))
+            self.assertEqual(recommendation.recommended_fields, [field_id for field_id, score in expected])
+            self.assertEqual(list(recommendation.items.order_by('rank').values_list('field_id', flat=True)), recommendation.recommended_fields)
+        self.assertEqual(Recommendation.objects.count(), 7)
+
+
+class RecommendationEngineTests(TestCase):
+
+    def setUp(self):
+        # Columns: academic_interests, perceived_skills, then the dimensions weighted 0
+        self.engine = RecommendationEngine([3, 7, 11, 20], [
+            [1, 0, 0, 0],
+            [0.5, 1, 0, 0],
+            [1, 0, 0, 0],
+            [0, 0, 1, 1],
+        ])
+        self.profile = {'academic_interests': 1, 'perceived_skills': 1}
+
+    def assertTopK(self, user_scores, k, expected):
+        top = self.engine.top_k(user_scores, k)
+        self.assertEqual([field_id for field_id, score in top], [field_id for field_id, score in expected])
+        for (_, score), (_, expected_score) in zip(top, expected):
+            self.assertAlmostEqual(score, expected_score)
+        self.assertEqual(self.engine.top_k_many([user_scores], k), [top])
+
+    def test_ties_are_broken_by_lowest_field_id(self):
+        self.assertTopK(self.profile, 2, [(7, 0.5), (3, 0.4)])
+        self.assertTopK(self.profile, 3, [(7, 0.5), (3, 0.4), (11, 0.4)])
+
+    def test_k_larger_than_the_catalog_returns_every_field(self):
+        self.assertTopK(self.profile, 10, [(7, 0.5), (3, 0.4), (11, 0.4), (20, 0.0)])
+
+    def test_k_not_positive_returns_nothing(self):
+        for k in (0, -1):
+            self.assertEqual(self.engine.top_k(self.profile, k), [])
+            self.assertEqual(self.engine.top_k_many([self.profile], k), [[]])
+
+    def test_empty_index_returns_nothing(self):
+        engine = RecommendationEngine.from_index()
+        self.assertEqual(len(engine), 0)
+        self.assertEqual(engine.top_k(self.profile), [])
+        self.assertEqual(engine.top_k_many([self.profile, self.profile]), [[], []])
+
+    def test_scores_at_the_activation_threshold_do_not_count(self):
+        at_threshold = {'academic_interests': ACTIVATION_THRESHOLD, 'perceived_skills': 1}
+        self.assertTopK(at_threshold, 3, [(7, 0.3), (3, 0.0), (11, 0.0)])
+
+        above = {'academic_interests': 0.6, 'perceived_skills': ACTIVATION_THRESHOLD}
+        self.assertTopK(above, 4, [(3, 0.24), (11, 0.24), (7, 0.12), (20, 0.0)])
+
+
+class ScoringTests(TestCase):
+
+    def test_compiled_scorers(self):
+        mcq = Question.objects.create(
+            text="Matière préférée", category='academic_interests', question_type='mcq',
+            options=['Sciences (maths, physique, chimie)', 'Littérature et langues'],
+        )
+        ranking = Question.objects.create(
+            text="Classez ces activités", category='perceived_skills', question_type='ranking',
+            options=['Résoudre des problèmes de maths', 'Dessiner', {'label': 'Programmer', 'weight': 4}],
+        )
+        likert = Question.objects.create(text="J'aime calculer", category='perceived_skills', question_type='likert', options=[1, 2, 3, 4, 5])
+
+        scorers = get_scorers()
+        self.assertEqual(scorers[mcq.pk].score('Sciences (maths, physique, chimie)'), 2)
+        self.assertEqual(scorers[mcq.pk].score(' sciences (MATHS, physique, chimie)'), 2)
+        self.assertEqual(scorers[mcq.pk].score('Littérature et langues'), 0)
+        self.assertEqual(scorers[ranking.pk].score(['Programmer', 'Dessiner', 'Résoudre des problèmes de maths']), 4 + 2 / 3)
+        self.assertEqual(scorers[ranking.pk].score('Programmer'), 4)
+        self.assertEqual(scorers[likert.pk].score(3), 3)
+        self.assertEqual(scorers[likert.pk].score('3'), 0)
+
+        # Scorers are recompiled when the question bank changes
+        mcq.options = ['Littérature et langues', {'label': 'Sciences (maths, physique, chimie)', 'weight': 1}]
+        mcq.save()
+        self.assertEqual(get_scorers()[mcq.pk].score('Sciences (maths, physique, chimie)'), 1)
+
+
+class AnswerValidationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user('etudiant', 'etudiant@enspd.cm', 'etudiant123', role='student')
+        cls.likert = Question.objects.create(text="J'aime calculer", category='perceived_skills', question_type='likert', options=[1, 2, 3, 4, 5])
+        cls.mcq = Question.objects.create(text="Matière préférée", category='academic_interests', question_type='mcq', options=['Sciences', 'Arts'])
+        cls.ranking = Question.objects.create(text="Classez", category='work_preferences', question_type='ranking', options=['Seul', 'En équipe', 'Dehors'])
+        cls.orientation_test = OrientationTest.objects.create(user=cls.student)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_schemas(self):
+        schemas = get_answer_schemas()
+        self.assertIsNone(schemas[self.likert.pk].error(5))
+        for answer in (0, 6, 2.5, True, '3', None):
+            self.assertIsNotNone(schemas[self.likert.pk].error(answer), answer)
+        self.assertIsNone(schemas[self.mcq.pk].error('Arts'))
+        self.assertIsNotNone(schemas[self.mcq.pk].error('Musique'))
+        self.assertIsNone(schemas[self.ranking.pk].error(['Dehors', 'Seul', 'En équipe']))
+        self.assertIsNone(schemas[self.ranking.pk].error('Seul')) # Single choice of the test page
+        for answer in (['Dehors', 'Seul'], ['Dehors', 'Seul', 'Seul'], ['Dehors', 'Seul', 'Musique'], 'Musique', 3):
+            self.assertIsNotNone(schemas[self.ranking.pk].error(answer), answer)
+
+    def test_unknown_ids_reload_the_bank_at_most_once_per_interval(self):
+        get_question_map()
+        with mock.patch('orientation.question_bank._last_forced_reload', None):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_questions([self.mcq.pk, 0]), {self.mcq.pk: get_question_map()[self.mcq.pk]})
+            with self.assertNumQueries(0):
+                for _ in range(3):
+                    get_answer_schemas([0])
+
+    def test_submit_response(self):
+        url = reverse('test-submit-response', args=[self.orientation_test.pk])
+        response = self.client.post(url, {'question_id': self.mcq.pk, 'answer': 'Musique'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('answer', response.data)
+        response = self.client.post(url, {'question_id': 0, 'answer': 'Arts'}, format='json')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(url, {'question_id': self.mcq.pk, 'answer': 'Arts'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+    def test_weighted_options_are_shown_and_answered_by_label(self):
+        weighted = Question.objects.create(
+            text="Matière préférée", category='academic_interests', question_type='mcq',
+            options=[{'label': 'Physique', 'weight': 2}, 'Histoire'],
+        )
+        listed = {question['id']: question for question in self.client.get(reverse('question-list')).json()}
+        self.assertEqual(listed[weighted.pk]['options'], ['Physique', 'Histoire'])
+        self.assertEqual(listed[self.likert.pk]['options'], [1, 2, 3, 4, 5])
+
+        url = reverse('test-submit-response', args=[self.orientation_test.pk])
+        self.assertEqual(self.client.post(url, {'question_id': weighted.pk, 'answer': 'Physique'}, format='json').status_code, 201)
+
+        admin = User.objects.create_user('admin', 'admin@enspd.cm', 'admin123', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('question-detail', args=[weighted.pk]))
+        self.assertEqual(response.data['options'][0], {'label': 'Physique', 'weight': 2})
+
+    def test_submit_responses_batch(self):
+        url = reverse('test-submit-responses', args=[self.orientation_test.pk])
+        payload = {'responses': [
+            {'question_id': self.likert.pk, 'answer': 4},
+            {'question_id': self.ranking.pk, 'answer': ['Seul']},
+        ]}
+        response = self.client.post(url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['responses'][0], {})
+        self.assertIn('answer', response.data['responses'][1])
+        self.assertFalse(self.orientation_test.responses.exists())
@@ -4,8 +4,10 @@ from .views import (
     QuestionDetailView,
     OrientationTestStartView,
     TestResponseSubmitView,
+    TestResponseBatchSubmitView,
     OrientationTestCompleteView,
     OrientationTestResultView,
+    ScoringJobDetailView,
     UserOrientationTestListView,
     TestResponseListView,
     # OrientationTestNew,
@@ -16,8 +18,10 @@ urlpatterns = [
     path('questions/<int:pk>/', QuestionDetailView.as_view(), name='question-detail'),
     path('tests/start/', OrientationTestStartView.as_view(), name='test-start'),
     path('tests/<int:test_id>/submit-response/', TestResponseSubmitView.as_view(), name='test-submit-response'),
+    path('tests/<int:test_id>/submit-responses/', TestResponseBatchSubmitView.as_view(), name='test-submit-responses'),
     path('tests/<int:test_id>/complete/', OrientationTestCompleteView.as_view(), name='test-complete'),
     path('tests/<int:pk>/result/', OrientationTestResultView.as_view(), name='test-result'),
+    path('jobs/<int:pk>/', ScoringJobDetailView.as_view(), name='scoring-job-detail'),
     path('my-tests/', UserOrientationTestListView.as_view(), name='my-tests-list'),
     path('tests/<int:test_id>/responses/', TestResponseListView.as_view(), name='test-responses-list'),
     # path('tests/new', OrientationTestNiew.as_view(), name='new-test');
@@ -0,0 +1,79 @@
+from numbers import Number
+
+from .question_bank import CompiledQuestions
+from .scoring import option_label
+
+# Likert range used when a likert question lists no options
+DEFAULT_LIKERT_SCALE = (1, 2, 3, 4, 5)
+
+
+class AnswerSchema:
+    """
+    Constraints on the answers of one question, derived once from its options.
+    `error(answer)` returns None for a valid answer, else the reason it is rejected.
+    """
+
+    def __init__(self, question):
+        self.labels = frozenset(option_label(option) for option in question.options or [])
+
+    def error(self, answer):
+        return None
+
+
+class LikertSchema(AnswerSchema):
+    def __init__(self, question):
+        values = [option for option in question.options or [] if isinstance(option, Number) and not isinstance(option, bool)]
+        self.values = frozenset(values or DEFAULT_LIKERT_SCALE)
+        self.low, self.high = min(self.values), max(self.values)
+
+    def error(self, answer):
+        if isinstance(answer, bool) or not isinstance(answer, Number) or answer not in self.values:
+            return f"Expected a value of the scale {self.low} to {self.high}."
+        return None
+
+
+class ChoiceSchema(AnswerSchema):
+    def error(self, answer):
+        if not isinstance(answer, str):
+            return "Expected one of the options, as a string."
+        if self.labels and answer not in self.labels:
+            return "Not one of the options of this question."
+        return None
+
+
+class RankingSchema(AnswerSchema):
+    """
+    A full ranking, or a single option: the test page still submits rankings as one choice,
+    scored as the top choice.
+    """
+
+    def error(self, answer):
+        if isinstance(answer, str):
+            return None if answer in self.labels else "Not one of the options of this question."
+        if not isinstance(answer, list) or not all(isinstance(choice, str) for choice in answer):
+            return "Expected the list of options, in order of preference."
+        # Every option exactly once
+        if len(answer) != len(self.labels) or frozenset(answer) != self.labels:
+            return "Expected each option of this question exactly once."
+        return None
+
+
+SCHEMAS = {
+    'likert': LikertSchema,
+    'mcq': ChoiceSchema,
+    'ranking': RankingSchema,
+}
+
+
+def compile_schema(question):
+    return SCHEMAS.get(question.question_type, AnswerSchema)(question)
+
+
+_schemas = CompiledQuestions(compile_schema)
+
+
+def get_answer_schemas(question_ids=None):
+    """
+    Returns {question id: AnswerSchema} for the question bank, compiled once per question bank version.
+    """
+    return _schemas.get(question_ids)
@@ -1,15 +1,24 @@
+import hashlib
+
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
+from rest_framework.renderers import JSONRenderer
 from rest_framework.views import APIView
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
-from .models import Question, OrientationTest, TestResponse, Recommendation
-from .serializers import QuestionSerializer, OrientationTestSerializer, TestResponseSerializer, RecommendationSerializer
+from django.utils import timezone
+from .models import Question, OrientationTest, TestResponse, Recommendation, ScoringJob
+from .serializers import QuestionAdminSerializer, QuestionSerializer, OrientationTestSerializer, TestResponseSerializer, RecommendationSerializer, TestResponseBatchSerializer, ScoringJobSerializer
 from accounts.permissions import IsAdmin, IsStudent
-from catalog.models import Field
-import random # For basic recommendation placeholder
+from .question_bank import QUESTION_BANK_NAMESPACE, get_question_bank_version
+from .validation import get_answer_schemas
+from .jobs import enqueue_scoring, is_async_scoring_enabled, score_test, scoring_queryset
 
 class QuestionListView(generics.ListCreateAPIView):
-    queryset = Question.objects.all()
+    queryset = Question.objects.all().order_by('id')
     serializer_class = QuestionSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsAdmin] # Admin can CRUD, others can only list
 
@@ -18,9 +27,33 @@ class QuestionListView(generics.ListCreateAPIView):
             return [permissions.IsAuthenticated(), IsAdmin()]
         return [permissions.AllowAny()] # Allow anyone to list questions for a test without logging in initially
 
+    def get_serializer_class(self):
+        # Admins write and read back the scoring weights, the test page only gets the labels
+        return QuestionSerializer if self.request.method == 'GET' else QuestionAdminSerializer
+
+    def list(self, request, *args, **kwargs):
+        # The rendered question bank is cached per version, which changes on every write or when it expires
+        version = get_question_bank_version()
+        cache_key = f'{QUESTION_BANK_NAMESPACE}:payload:{version}'
+        cached = cache.get(cache_key)
+        if cached is None:
+            body = JSONRenderer().render(self.get_serializer(self.get_queryset(), many=True).data)
+            cached = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+            cache.set(cache_key, cached, timeout=settings.QUESTION_BANK_MAX_AGE)
+        etag, body = cached
+
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.QUESTION_BANK_MAX_AGE}'
+        return response
+
 class QuestionDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Question.objects.all()
-    serializer_class = QuestionSerializer
+    serializer_class = QuestionAdminSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdmin]
 
 class OrientationTestStartView(APIView):
@@ -46,125 +79,94 @@ class TestResponseSubmitView(APIView):
         question_id = request.data.get('question_id')
         answer_data = request.data.get('answer')
 
-        question = get_object_or_404(Question, pk=question_id)
+        try:
+            question_id = int(question_id)
+        except (TypeError, ValueError):
+            raise Http404
+        schema = get_answer_schemas([question_id]).get(question_id)
+        if schema is None:
+            raise Http404
+
+        error = schema.error(answer_data)
+        if error:
+            return Response({"answer": [error]}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Optional: Validate answer_data format based on question.question_type
-        # For simplicity, we just save it as is
-        
         test_response, created = TestResponse.objects.update_or_create(
             orientation_test=orientation_test,
-            question=question,
+            question_id=question_id,
             defaults={'answer': answer_data}
         )
         serializer = TestResponseSerializer(test_response)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-class OrientationTestCompleteView(APIView):
+class TestResponseBatchSubmitView(APIView):
+    """
+    Saves all (or a page of) the answers of a test in one request and one transaction.
+    Answers to already answered questions are overwritten.
+    """
     permission_classes = [permissions.IsAuthenticated, IsStudent]
 
     def post(self, request, test_id):
-        orientation_test = get_object_or_404(OrientationTest, pk=test_id, user=request.user, is_completed=False)
-        
-        # Mark test as completed
-        orientation_test.is_completed = True
-        orientation_test.completed_at = timezone.now() # Import timezone
-        orientation_test.save()
+        orientation_test = get_object_or_404(
+            OrientationTest.objects.only('id'), pk=test_id, user=request.user, is_completed=False
+        )
+        serializer = TestResponseBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        test_responses = [
+            TestResponse(orientation_test=orientation_test, question_id=item['question_id'], answer=item['answer'])
+            for item in serializer.validated_data['responses']
+        ]
+        with transaction.atomic():
+            TestResponse.objects.bulk_create(
+                test_responses,
+                update_conflicts=True,
+                unique_fields=['orientation_test', 'question'],
+                update_fields=['answer'],
+            )
+
+        return Response({
+            "orientation_test": orientation_test.id,
+            "saved": len(test_responses),
+            "question_ids": [test_response.question_id for test_response in test_responses],
+        }, status=status.HTTP_200_OK)
 
 class OrientationTestCompleteView(APIView):
+    """
+    Marks a test as completed and computes its recommendation.
+
+    With ORIENTATION_ASYNC_SCORING the computation is queued for `manage.py run_scoring_worker`
+    and the response is a 202 carrying the job status URL; otherwise it runs inside the request.
+    """
     permission_classes = [permissions.IsAuthenticated, IsStudent]
 
     def post(self, request, test_id):
-        orientation_test = get_object_or_404(OrientationTest, pk=test_id, user=request.user, is_completed=False)
-        
-        # Mark test as completed
+        orientation_test = get_object_or_404(
+            scoring_queryset().select_related('user'), pk=test_id, user=request.user, is_completed=False
+        )
         orientation_test.is_completed = True
         orientation_test.completed_at = timezone.now()
-        orientation_test.save()
-
-        # --- Recommendation Algorithm Placeholder (Simplified) ---
-        user_scores = {
-            'academic_interests': 0,
-            'perceived_skills': 0,
-            'professional_values': 0,
-            'work_preferences': 0,
-        }
-        
-        # Iterate through responses to calculate user scores
-        for response in orientation_test.responses.all():
-            question = response.question
-            answer = response.answer # Assuming answer is a simple value for calculation
-            
-            # Simple scoring logic (needs refinement based on actual question types and options)
-            if question.question_type == 'likert' and isinstance(answer, (int, float)):
-                if question.category in user_scores:
-                    user_scores[question.category] += answer
-            elif question.question_type == 'mcq':
-                # For MCQ, assume answer is a string and some options are "stronger" indicators
-                # This is a very basic placeholder; real scoring would be more complex
-                if isinstance(answer, str) and 'science' in answer.lower() and question.category == 'academic_interests':
-                     user_scores[question.category] += 2
-                elif isinstance(answer, str) and 'math' in answer.lower() and question.category == 'perceived_skills':
-                     user_scores[question.category] += 2
-                # More detailed scoring logic needed here
-
-        # Normalize scores (simple division by count or max possible score for each category)
-        # For this simplified example, let's just make them between 0 and 1
-        for category in user_scores:
-            user_scores[category] = min(1, user_scores[category] / 5) # Assuming max score of 5 per category for simplicity
-
-        orientation_test.scores_data = user_scores
-        orientation_test.save()
-
-        # --- Matching with Fields ---
-        all_fields = Field.objects.all()
-        field_compatibility = {}
-
-        for field in all_fields:
-            compatibility_score = 0
-            
-            # Match academic interests (simple keyword matching)
-            if 'academic_interests' in user_scores and user_scores['academic_interests'] > 0.5:
-                if any(keyword.lower() in field.description.lower() for keyword in ['science', 'tech', 'informatique', 'ingénierie']):
-                    compatibility_score += user_scores['academic_interests'] * 0.4
-            
-            # Match perceived skills (simple keyword matching)
-            if 'perceived_skills' in user_scores and user_scores['perceived_skills'] > 0.5:
-                if any(skill.lower() in field.required_skills for skill in ['mathématiques', 'programmation', 'analyse']):
-                    compatibility_score += user_scores['perceived_skills'] * 0.3
-
-            # Add other matching criteria based on professional_values, work_preferences and field attributes
-            # For example, if user values high salary, fields with high tuition_fees_max might indicate higher earning potential
-            
-            # Max compatibility is 1.0 (100%)
-            field_compatibility[field.id] = min(1.0, compatibility_score)
-        
-        # Sort fields by compatibility and get top 5
-        sorted_fields = sorted(field_compatibility.items(), key=lambda item: item[1], reverse=True)[:5]
-        
-        recommended_fields_ids = [field_id for field_id, score in sorted_fields]
-        compatibility_scores_dict = {str(field_id): round(score * 100, 2) for field_id, score in sorted_fields} # Convert to percentage
-
-        justification_text = "Cette recommandation est basée sur l'analyse de vos intérêts académiques et compétences perçues. Les filières proposées correspondent le mieux à votre profil."
-        if not recommended_fields_ids:
-            justification_text = "Nous n'avons pas pu trouver de recommandations précises pour vous. Veuillez réessayer le test ou contacter un conseiller."
-
-
-        recommendation, created = Recommendation.objects.update_or_create(
-            orientation_test=orientation_test,
-            defaults={
-                'recommended_fields': recommended_fields_ids,
-                'compatibility_scores': compatibility_scores_dict,
-                'justification': justification_text
-            }
-        )
 
-        serializer = OrientationTestSerializer(orientation_test)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if not is_async_scoring_enabled():
+            score_test(orientation_test)
+            serializer = OrientationTestSerializer(orientation_test)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        with transaction.atomic():
+            orientation_test.save(update_fields=['is_completed', 'completed_at'])
+            job = enqueue_scoring(orientation_test)
+        data = dict(
+            OrientationTestSerializer(orientation_test).data,
+            scoring_job=ScoringJobSerializer(job, context={'request': request}).data,
+        )
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
-        serializer = OrientationTestSerializer(orientation_test)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+class ScoringJobDetailView(generics.RetrieveAPIView):
+    serializer_class = ScoringJobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsStudent]
 
-from django.utils import timezone # Import timezone
+    def get_queryset(self):
+        return ScoringJob.objects.filter(orientation_test__user=self.request.user)
 
 class OrientationTestResultView(generics.RetrieveAPIView):
     queryset = OrientationTest.objects.all()
@@ -172,15 +174,35 @@ class OrientationTestResultView(generics.RetrieveAPIView):
     permission_classes = [permissions.IsAuthenticated, IsStudent]
 
     def get_object(self):
-        obj = get_object_or_404(OrientationTest, pk=self.kwargs['pk'], user=self.request.user, is_completed=True)
+        queryset = OrientationTestSerializer.setup_eager_loading(OrientationTest.objects.all(), self.request)
+        obj = get_object_or_404(queryset, pk=self.kwargs['pk'], user=self.request.user, is_completed=True)
         return obj
 
+    def retrieve(self, request, *args, **kwargs):
+        orientation_test = self.get_object()
+        if hasattr(orientation_test, 'recommendation'):
+            return Response(dict(self.get_serializer(orientation_test).data, scoring_status='ready'))
+
+        # Completed but not scored yet: report the state of its latest scoring job
+        job = orientation_test.scoring_jobs.order_by('-created_at', '-id').first()
+        if job is None or job.status == 'failed':
+            return Response(
+                {"id": orientation_test.id, "scoring_status": 'failed', "detail": "The recommendation could not be computed."},
+                status=status.HTTP_200_OK,
+            )
+        return Response({
+            "id": orientation_test.id,
+            "scoring_status": job.status,
+            "scoring_job": ScoringJobSerializer(job, context={'request': request}).data,
+        }, status=status.HTTP_202_ACCEPTED)
+
 class UserOrientationTestListView(generics.ListAPIView):
     serializer_class = OrientationTestSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     
     def get_queryset(self):
-        return OrientationTest.objects.filter(user=self.request.user).order_by('-started_at')
+        queryset = OrientationTest.objects.filter(user=self.request.user).order_by('-started_at')
+        return OrientationTestSerializer.setup_eager_loading(queryset, self.request)
     
 class TestResponseListView(generics.ListAPIView):
     serializer_class = TestResponseSerializer